@@ -1,24 +1,21 @@
 """
 Context processor for the shopping bag.
 
-This module provides the `bag_contents` function, which retrieves the 
-current shopping bag contents and calculates the order total, 
+This module provides the `bag_contents` function, which retrieves the
+current shopping bag contents and calculates the order total,
 delivery cost, and applicable discounts.
 """
 
-from decimal import Decimal
-from django.conf import settings
-from django.shortcuts import get_object_or_404
-from products.models import Product
+from .pricing import get_bag_pricing
 
 
 def bag_contents(request):
     """
     Retrieve shopping bag contents and calculate totals.
 
-    This function extracts product details from the session-based bag,
-    calculates the total cost, and determines delivery charges based
-    on store settings.
+    The pricing itself is done by `bag.pricing`, which loads all products
+    in one query and memoizes the result on the request. Products that
+    have been deleted are left out rather than raising a 404.
 
     Args:
         request (HttpRequest): The incoming request.
@@ -33,57 +30,14 @@ def bag_contents(request):
             - `free_delivery_threshold`: The store's free delivery threshold.
             - `grand_total`: The total cost including delivery charges.
     """
-    bag_items = []
-    total = 0
-    product_count = 0
-    bag = request.session.get("bag", {})
-
-    for item_id, item_data in bag.items():
-        product = get_object_or_404(Product, pk=item_id)
-
-        if isinstance(
-            item_data, int
-        ):  # Standard product (no size variation)
-            total += item_data * product.price
-            product_count += item_data
-            bag_items.append(
-                {
-                    "item_id": item_id,
-                    "quantity": item_data,
-                    "product": product,
-                }
-            )
-        else:  # Product with size variations
-            for size, quantity in item_data["items_by_size"].items():
-                total += quantity * product.price
-                product_count += quantity
-                bag_items.append(
-                    {
-                        "item_id": item_id,
-                        "quantity": quantity,
-                        "product": product,
-                        "size": size,
-                    }
-                )
-
-    # Calculate delivery charges and free delivery threshold differences
-    if total < settings.FREE_DELIVERY_THRESHOLD:
-        delivery = total * Decimal(
-            settings.STANDARD_DELIVERY_PERCENTAGE / 100
-        )
-        free_delivery_delta = settings.FREE_DELIVERY_THRESHOLD - total
-    else:
-        delivery = 0
-        free_delivery_delta = 0
-
-    grand_total = delivery + total
+    pricing = get_bag_pricing(request)
 
     return {
-        "bag_items": bag_items,
-        "total": total,
-        "product_count": product_count,
-        "delivery": delivery,
-        "free_delivery_delta": free_delivery_delta,
-        "free_delivery_threshold": settings.FREE_DELIVERY_THRESHOLD,
-        "grand_total": grand_total,
+        "bag_items": pricing["bag_items"],
+        "total": pricing["total"],
+        "product_count": pricing["product_count"],
+        "delivery": pricing["delivery"],
+        "free_delivery_delta": pricing["free_delivery_delta"],
+        "free_delivery_threshold": pricing["free_delivery_threshold"],
+        "grand_total": pricing["grand_total"],
     }
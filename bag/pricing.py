@@ -0,0 +1,162 @@
+"""
+Bag pricing service for the shopping bag.
+
+This module provides a single place where the session-based shopping bag
+is turned into priced line items. It is shared by the `bag_contents`
+context processor, the checkout view and the Stripe webhook handler.
+
+Key Features:
+- Loads every product in the bag, with its promotional price, in one
+  `in_bulk` query.
+- Memoizes the priced bag on the request, so it is only computed once
+  per request no matter how many callers ask for it.
+- Drops products that no longer exist instead of raising a 404.
+"""
+
+import json
+from decimal import Decimal
+
+from django.conf import settings
+
+from products.models import Product
+from products.promotions import ensure_effective_prices_current
+
+
+def _load_products(bag):
+    """
+    Fetch all products referenced by a bag in a single query.
+
+    Args:
+        bag (dict): The session bag, keyed by product id.
+
+    Returns:
+        dict: A mapping of product primary key to `Product` instance.
+    """
+    product_ids = [int(item_id) for item_id in bag if str(item_id).isdigit()]
+    if not product_ids:
+        return {}
+    ensure_effective_prices_current()
+    return Product.objects.select_related("effective_price").in_bulk(
+        product_ids
+    )
+
+
+def calculate_delivery(total):
+    """
+    Calculate the delivery cost and the free delivery delta for a total.
+
+    Args:
+        total (Decimal): The total cost of the items in the bag.
+
+    Returns:
+        tuple: The delivery cost and the amount still needed to qualify
+            for free delivery.
+    """
+    if total < settings.FREE_DELIVERY_THRESHOLD:
+        delivery = total * Decimal(
+            settings.STANDARD_DELIVERY_PERCENTAGE / 100
+        )
+        free_delivery_delta = settings.FREE_DELIVERY_THRESHOLD - total
+    else:
+        delivery = 0
+        free_delivery_delta = 0
+    return delivery, free_delivery_delta
+
+
+def price_bag(bag):
+    """
+    Price the contents of a shopping bag.
+
+    Handles both standard products (stored as a quantity) and products
+    with size variations (stored under `items_by_size`). Products that
+    have been deleted are skipped and reported in `missing_item_ids`.
+
+    Args:
+        bag (dict): The session bag, keyed by product id.
+
+    Returns:
+        dict: A dictionary containing:
+            - `bag_items`: List of priced items in the bag.
+            - `total`: The total cost of items in the bag.
+            - `product_count`: The total number of products in the bag.
+            - `delivery`: The calculated delivery cost.
+            - `free_delivery_delta`: Amount needed for free delivery.
+            - `free_delivery_threshold`: The free delivery threshold.
+            - `grand_total`: The total cost including delivery charges.
+            - `missing_item_ids`: Bag ids whose product no longer exists.
+    """
+    products = _load_products(bag)
+
+    bag_items = []
+    missing_item_ids = []
+    total = 0
+    product_count = 0
+
+    for item_id, item_data in bag.items():
+        product = (
+            products.get(int(item_id)) if str(item_id).isdigit() else None
+        )
+        if product is None:
+            missing_item_ids.append(item_id)
+            continue
+
+        if isinstance(item_data, int):  # Standard product (no sizes)
+            total += item_data * product.current_price
+            product_count += item_data
+            bag_items.append(
+                {
+                    "item_id": item_id,
+                    "quantity": item_data,
+                    "product": product,
+                }
+            )
+        else:  # Product with size variations
+            for size, quantity in item_data["items_by_size"].items():
+                total += quantity * product.current_price
+                product_count += quantity
+                bag_items.append(
+                    {
+                        "item_id": item_id,
+                        "quantity": quantity,
+                        "product": product,
+                        "size": size,
+                    }
+                )
+
+    delivery, free_delivery_delta = calculate_delivery(total)
+
+    return {
+        "bag_items": bag_items,
+        "total": total,
+        "product_count": product_count,
+        "delivery": delivery,
+        "free_delivery_delta": free_delivery_delta,
+        "free_delivery_threshold": settings.FREE_DELIVERY_THRESHOLD,
+        "grand_total": delivery + total,
+        "missing_item_ids": missing_item_ids,
+    }
+
+
+def get_bag_pricing(request):
+    """
+    Return the priced session bag, memoized on the request.
+
+    The result is cached on the request together with a snapshot of the
+    bag, so a bag that changes mid-request is priced again.
+
+    Args:
+        request (HttpRequest): The incoming request.
+
+    Returns:
+        dict: The priced bag, as returned by `price_bag`.
+    """
+    bag = request.session.get("bag", {})
+    snapshot = json.dumps(bag, sort_keys=True)
+
+    cached = getattr(request, "_bag_pricing", None)
+    if cached and cached[0] == snapshot:
+        return cached[1]
+
+    pricing = price_bag(bag)
+    request._bag_pricing = (snapshot, pricing)
+    return pricing
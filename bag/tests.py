@@ -8,6 +8,8 @@ to ensure proper functionality.
 from django.test import TestCase, Client
 from django.urls import reverse
 from products.models import Product
+from products.promotions import ensure_effective_prices_current
+from .pricing import price_bag
 
 
 class BagViewsTestCase(TestCase):
@@ -127,3 +129,54 @@ class BagViewsTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         session = self.client.session
         self.assertNotIn(str(self.product.id), session["bag"])
+
+    def test_view_bag_with_deleted_product(self):
+        """
+        Test that a deleted product is dropped from the bag instead of
+        raising a 404 from the context processor.
+        """
+        session = self.client.session
+        session["bag"] = {str(self.product.id): 1, "999999": 2}
+        session.save()
+
+        response = self.client.get(self.view_bag_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["bag_items"]), 1)
+        self.assertEqual(response.context["product_count"], 1)
+
+
+class BagPricingTestCase(TestCase):
+    """
+    Test case for the bag pricing service.
+
+    This class contains tests for:
+    - Loading every product in the bag with a single query.
+    - Calculating totals for standard and size-based products.
+    """
+
+    def setUp(self):
+        """
+        Create a handful of test products.
+        """
+        self.products = [
+            Product.objects.create(name=f"Product {i}", price=10.00)
+            for i in range(5)
+        ]
+
+    def test_price_bag_uses_single_query(self):
+        """
+        Test that pricing a bag runs one query regardless of its size.
+        """
+        bag = {str(p.id): 1 for p in self.products}
+        bag[str(self.products[0].id)] = {"items_by_size": {"S": 1, "M": 2}}
+
+        ensure_effective_prices_current()
+        with self.assertNumQueries(1):
+            pricing = price_bag(bag)
+
+        self.assertEqual(len(pricing["bag_items"]), 6)
+        self.assertEqual(pricing["product_count"], 7)
+        self.assertEqual(pricing["total"], 70)
+        self.assertEqual(pricing["grand_total"], 70)
+        self.assertEqual(pricing["missing_item_ids"], [])
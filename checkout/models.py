@@ -190,8 +190,11 @@ class OrderLineItem(models.Model):
         """
         Override the original save method to calculate the line item total
         and update the order total accordingly.
+
+        Uses the product's promotional price, if any (see
+        `products.promotions`).
         """
-        self.lineitem_total = self.product.price * self.quantity
+        self.lineitem_total = self.product.current_price * self.quantity
         super().save(*args, **kwargs)
 
     def __str__(self):
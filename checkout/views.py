@@ -20,10 +20,10 @@ from django.conf import settings
 from .forms import OrderForm
 from .models import Order, OrderLineItem
 
-from products.models import Product
 from profiles.models import UserProfile
 from profiles.forms import UserProfileForm
-from bag.contexts import bag_contents
+from bag.pricing import get_bag_pricing
+from store_settings.cache import get_currency
 
 import stripe
 import json
@@ -105,6 +105,16 @@ def checkout(request):
 
         order_form = OrderForm(form_data)
         if order_form.is_valid():
+            pricing = get_bag_pricing(request)
+            if pricing["missing_item_ids"]:
+                messages.error(
+                    request,
+                    "One of the products in your bag wasn't found in"
+                    "our database."
+                    "Please call us for assistance!",
+                )
+                return redirect(reverse("view_bag"))
+
             order = order_form.save(commit=False)
             pid = (
                 request.POST.get("client_secret", "").split("_secret")[0]
@@ -115,32 +125,13 @@ def checkout(request):
             order.original_bag = json.dumps(bag)
             order.save()
 
-            for item_id, item_data in bag.items():
-                try:
-                    product = Product.objects.get(id=item_id)
-                    if isinstance(item_data, int):
-                        OrderLineItem.objects.create(
-                            order=order, product=product, quantity=item_data
-                        )
-                    else:
-                        for size, quantity in item_data.get(
-                            "items_by_size", {}
-                        ).items():
-                            OrderLineItem.objects.create(
-                                order=order,
-                                product=product,
-                                quantity=quantity,
-                                product_size=size,
-                            )
-                except Product.DoesNotExist:
-                    messages.error(
-                        request,
-                        "One of the products in your bag wasn't found in"
-                        "our database."
-                        "Please call us for assistance!",
-                    )
-                    order.delete()
-                    return redirect(reverse("view_bag"))
+            for item in pricing["bag_items"]:
+                OrderLineItem.objects.create(
+                    order=order,
+                    product=item["product"],
+                    quantity=item["quantity"],
+                    product_size=item.get("size"),
+                )
 
             request.session["save_info"] = "save-info" in request.POST
             return redirect(
@@ -161,13 +152,13 @@ def checkout(request):
             )
             return redirect(reverse("products"))
 
-        current_bag = bag_contents(request)
+        current_bag = get_bag_pricing(request)
         total = current_bag["grand_total"]
         if total > 0:
             stripe_total = round(total * 100)
             stripe.api_key = stripe_secret_key
             intent = stripe.PaymentIntent.create(
-                amount=stripe_total, currency=settings.STRIPE_CURRENCY
+                amount=stripe_total, currency=get_currency()
             )
 
         if request.user.is_authenticated:
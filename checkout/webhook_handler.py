@@ -13,6 +13,7 @@ from django.conf import settings
 from .models import Order, OrderLineItem
 from products.models import Product
 from profiles.models import UserProfile
+from bag.pricing import price_bag
 
 import json
 import time
@@ -168,27 +169,21 @@ class StripeWH_Handler:
                     original_bag=bag,
                     stripe_pid=pid,
                 )
-                # Add order line items
-                for item_id, item_data in json.loads(bag).items():
-                    product = Product.objects.get(id=item_id)
-                    if isinstance(item_data, int):
-                        order_line_item = OrderLineItem(
-                            order=order,
-                            product=product,
-                            quantity=item_data,
-                        )
-                        order_line_item.save()
-                    else:
-                        for size, quantity in item_data[
-                            "items_by_size"
-                        ].items():
-                            order_line_item = OrderLineItem(
-                                order=order,
-                                product=product,
-                                quantity=quantity,
-                                product_size=size,
-                            )
-                            order_line_item.save()
+                # Add order line items, loading all products at once
+                pricing = price_bag(json.loads(bag))
+                if pricing["missing_item_ids"]:
+                    raise Product.DoesNotExist(
+                        "Products not found: "
+                        f'{", ".join(pricing["missing_item_ids"])}'
+                    )
+                for item in pricing["bag_items"]:
+                    order_line_item = OrderLineItem(
+                        order=order,
+                        product=item["product"],
+                        quantity=item["quantity"],
+                        product_size=item.get("size"),
+                    )
+                    order_line_item.save()
             except Exception as e:
                 if order:
                     order.delete()
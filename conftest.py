@@ -0,0 +1,19 @@
+"""
+Shared pytest fixtures for the project's test suites.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_store_settings_cache():
+    """
+    Start every test with an empty store settings cache.
+
+    The cache lives in process memory, so settings loaded by one test
+    would otherwise outlive its rolled back database.
+    """
+    from store_settings.cache import clear_settings_cache
+
+    clear_settings_cache()
+    yield
@@ -5,12 +5,8 @@ This module contains helper functions for displaying querysets in a structured f
 and a context processor that makes store settings available globally in templates.
 """
 
-from store_settings.models import (
-    StoreSettings,
-    ShippingSettings,
-    UserProfile,
-    Subscriber,
-)
+from store_settings.cache import get_shipping_settings, get_store_settings
+from store_settings.models import UserProfile, Subscriber
 from django.db import IntegrityError
 from django.db import models
 
@@ -81,10 +77,10 @@ def global_settings(request):
           are also included.
         - If a subscription exists without being linked to a user, it is updated.
     """
-    shipping_settings = ShippingSettings.objects.all().first()
+    shipping_settings = get_shipping_settings()
     subscribe_settings = None
     user_profile = None
-    store_settings = StoreSettings.get_instance()
+    store_settings = get_store_settings()
 
     if request.user.is_authenticated:
         user_profile = UserProfile.objects.filter(user=request.user).first()
@@ -16,3 +16,12 @@ class ProductsConfig(AppConfig):
     """
 
     name = "products"  # Specifies the name of the application
+
+    def ready(self):
+        """
+        Import and register signal handlers when the app is ready.
+
+        This keeps the product search index up to date whenever
+        products or categories change.
+        """
+        import products.signals  # Import signals to register them
@@ -0,0 +1,506 @@
+"""
+Catalog query pipeline for the products application.
+
+This module turns the catalog's query string (sort, direction, category,
+price, rating and search) into a filtered, ordered product queryset and
+paginates it.
+
+Key Features:
+- Filters are applied before pagination, so counts and pages always
+  match what is shown.
+- Result counts are cached per filter signature. Every cached count is
+  keyed by a catalog version that is bumped whenever a product or
+  category changes, so stale counts are never read after a change.
+- Next/previous links carry keyset (seek) cursors, so deep pages are
+  fetched with an indexed `WHERE` instead of a large `OFFSET`. Pages in
+  the second half of the catalog are read from the end in reverse.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage,
+    Page,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils.functional import cached_property
+
+from . import facets
+from .models import Product
+from .search import get_search_backend
+
+PRODUCTS_PER_PAGE = 6
+"""Number of products shown on each catalog page."""
+
+CATALOG_VERSION_KEY = "products:catalog_version"
+"""Cache key holding the current catalog version."""
+
+SORT_KEYS = {
+    # sort parameter: (order field, nullable)
+    "price": ("price", False),
+    "rating": ("rating", True),
+    "name": ("lower_name", False),
+    "category": ("category__name", True),
+}
+"""Sort options accepted by the catalog, mapped to their order field."""
+
+
+def get_catalog_version():
+    """
+    Return the current catalog version used to key cached counts.
+
+    Returns:
+        int: The catalog version.
+    """
+    cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+    return cache.get(CATALOG_VERSION_KEY, 1)
+
+
+def bump_catalog_version():
+    """
+    Invalidate all cached catalog counts by moving to a new version.
+    """
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 2, timeout=None)
+
+
+class CatalogQuery:
+    """
+    The sort, category and search options for a catalog page.
+
+    Attributes:
+        sort (str): The sort key (`price`, `rating`, `name`, `category`).
+        direction (str): `asc` or `desc`.
+        categories (list): Category names to filter by.
+        query (str): The search text.
+    """
+
+    def __init__(
+        self,
+        sort=None,
+        direction=None,
+        categories=None,
+        query=None,
+        price=None,
+        rating=None,
+    ):
+        """
+        Initializes the catalog query.
+
+        Args:
+            sort (str, optional): The sort key.
+            direction (str, optional): The sort direction.
+            categories (list, optional): Category names to filter by.
+            query (str, optional): The search text.
+            price (int, optional): The price bucket to filter by.
+            rating (str, optional): The whole-star rating to filter by,
+                or `"none"` for products without a rating.
+        """
+        self.sort = sort
+        self.direction = direction
+        self.categories = categories or []
+        self.query = query
+        self.price = (
+            price if price in range(len(facets.PRICE_BUCKETS)) else None
+        )
+        self.rating = (
+            rating
+            if rating == facets.NOT_RATED
+            or rating in [str(i) for i in range(facets.MAX_RATING + 1)]
+            else None
+        )
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Build a catalog query from the request's query string.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            CatalogQuery: The parsed catalog query.
+        """
+        categories = request.GET.get("category")
+        return cls(
+            sort=request.GET.get("sort"),
+            direction=request.GET.get("direction"),
+            categories=categories.split(",") if categories else None,
+            query=request.GET.get("q"),
+            price=(
+                int(request.GET["price"])
+                if request.GET.get("price", "").isdigit()
+                else None
+            ),
+            rating=request.GET.get("rating"),
+        )
+
+    @property
+    def signature(self):
+        """
+        A stable string identifying the filters and ordering.
+
+        Returns:
+            str: The filter signature.
+        """
+        return json.dumps(
+            [
+                self.sort,
+                self.direction,
+                sorted(self.categories),
+                self.query,
+                self.price,
+                self.rating,
+            ]
+        )
+
+    @property
+    def rating_bucket(self):
+        """The selected rating bucket, or None for unrated products."""
+        if self.rating in (None, facets.NOT_RATED):
+            return None
+        return int(self.rating)
+
+    @property
+    def ordering(self):
+        """
+        The keyset ordering as `(field, descending, nullable)` tuples.
+
+        The primary key is always the final tie-breaker. Relevance
+        ordered search results return None, as they are paginated by
+        offset.
+
+        Returns:
+            list or None: The ordering, or None if keyset is unavailable.
+        """
+        descending = self.direction == "desc"
+        if self.sort in SORT_KEYS:
+            field, nullable = SORT_KEYS[self.sort]
+            return [(field, descending, nullable), ("pk", descending, False)]
+        if self.query:
+            return None
+        return [("pk", False, False)]
+
+    def queryset(self):
+        """
+        Build the filtered and ordered product queryset.
+
+        Returns:
+            QuerySet: The products matching the catalog query.
+        """
+        products = Product.objects.select_related(
+            "category", "effective_price"
+        )
+
+        if self.categories:
+            products = products.filter(category__name__in=self.categories)
+
+        if self.price is not None:
+            low, high = facets.PRICE_BUCKETS[self.price]
+            products = products.filter(price__gte=low)
+            if high is not None:
+                products = products.filter(price__lt=high)
+
+        if self.rating == facets.NOT_RATED:
+            products = products.filter(rating__isnull=True)
+        elif self.rating is not None:
+            products = products.filter(rating__gte=self.rating_bucket)
+            if self.rating_bucket < facets.MAX_RATING:
+                products = products.filter(rating__lt=self.rating_bucket + 1)
+
+        if self.query:
+            # Results come back ordered by relevance
+            products = get_search_backend().search(products, self.query)
+
+        if self.sort == "name":
+            products = products.annotate(lower_name=Lower("name"))
+
+        if self.ordering:
+            products = products.order_by(*order_by(self.ordering))
+        elif not products.ordered:
+            products = products.order_by("pk")
+        return products
+
+    def count(self, queryset):
+        """
+        Return the number of matching products, cached per signature.
+
+        Args:
+            queryset (QuerySet): The queryset from `queryset()`.
+
+        Returns:
+            int: The number of matching products.
+        """
+        digest = hashlib.sha1(self.signature.encode()).hexdigest()
+        key = f"products:catalog_count:{get_catalog_version()}:{digest}"
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(
+                key,
+                count,
+                timeout=getattr(
+                    settings, "CATALOG_COUNT_CACHE_TIMEOUT", 300
+                ),
+            )
+        return count
+
+
+def order_by(ordering, reverse=False):
+    """
+    Convert a keyset ordering into `order_by()` expressions.
+
+    Nullable fields always sort their NULLs last in the forward
+    direction, on every database backend.
+
+    Args:
+        ordering (list): `(field, descending, nullable)` tuples.
+        reverse (bool): Whether to reverse the ordering.
+
+    Returns:
+        list: Expressions for `QuerySet.order_by()`.
+    """
+    nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+    expressions = []
+    for field, descending, nullable in ordering:
+        if descending != reverse:
+            expressions.append(F(field).desc(**nulls))
+        else:
+            expressions.append(F(field).asc(**nulls))
+    return expressions
+
+
+def seek_filter(ordering, values, forward=True):
+    """
+    Build the keyset condition for rows after (or before) a position.
+
+    Args:
+        ordering (list): `(field, descending, nullable)` tuples.
+        values (list): The key values of the boundary row.
+        forward (bool): True for rows after the row, False for before.
+
+    Returns:
+        Q: The filter selecting rows past the boundary row.
+    """
+    never = Q(pk__in=[])
+    clauses = []
+    prefix = Q()
+
+    for (field, descending, nullable), value in zip(ordering, values):
+        lookup = "gt" if descending != forward else "lt"
+        if value is None:
+            # NULLs sort last going forward
+            past = never if forward else Q(**{f"{field}__isnull": False})
+            equal = Q(**{f"{field}__isnull": True})
+        else:
+            past = Q(**{f"{field}__{lookup}": value})
+            if nullable and forward:
+                past |= Q(**{f"{field}__isnull": True})
+            equal = Q(**{field: value})
+        clauses.append(prefix & past)
+        prefix &= equal
+
+    return reduce(or_, clauses)
+
+
+def encode_cursor(ordering, product, signature):
+    """
+    Encode a product's position in the ordering as a URL-safe cursor.
+
+    Args:
+        ordering (list): `(field, descending, nullable)` tuples.
+        product (Product): The boundary product.
+        signature (str): The catalog query signature.
+
+    Returns:
+        str: The encoded cursor.
+    """
+    values = []
+    for field, descending, nullable in ordering:
+        value = product
+        for part in field.split("__"):
+            value = getattr(value, part, None) if value is not None else None
+        values.append(value)
+    payload = json.dumps(
+        {"s": signature_digest(signature), "k": values},
+        cls=DjangoJSONEncoder,
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor, signature):
+    """
+    Decode a cursor, rejecting cursors issued for a different query.
+
+    Args:
+        cursor (str): The encoded cursor.
+        signature (str): The catalog query signature.
+
+    Returns:
+        list or None: The key values, or None if the cursor is invalid.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("s") != signature_digest(signature):
+        return None
+    return payload.get("k")
+
+
+def signature_digest(signature):
+    """Returns a short digest of a catalog query signature."""
+    return hashlib.sha1(signature.encode()).hexdigest()[:12]
+
+
+class CatalogPaginator(Paginator):
+    """
+    Paginator using a cached count and keyset cursors where possible.
+
+    Pages are fetched by keyset seek when a valid cursor is given,
+    otherwise by OFFSET from whichever end of the ordering is closer.
+    """
+
+    def __init__(self, catalog_query, per_page=PRODUCTS_PER_PAGE):
+        """
+        Initializes the paginator.
+
+        Args:
+            catalog_query (CatalogQuery): The catalog query to paginate.
+            per_page (int): The number of products per page.
+        """
+        self.catalog_query = catalog_query
+        self.ordering = catalog_query.ordering
+        super().__init__(catalog_query.queryset(), per_page)
+
+    @cached_property
+    def count(self):
+        """Returns the cached number of matching products."""
+        return self.catalog_query.count(self.object_list)
+
+    def page_window(self, number, size=2):
+        """
+        Return the page numbers shown around the current page.
+
+        Args:
+            number (int): The current page number.
+            size (int): The number of pages shown on each side.
+
+        Returns:
+            range: The page numbers to link to.
+        """
+        first = max(1, number - size)
+        last = min(self.num_pages, number + size)
+        return range(first, last + 1)
+
+    def get_catalog_page(self, number, after=None, before=None):
+        """
+        Return a page, seeking from a cursor when one is given.
+
+        Args:
+            number: The requested page number.
+            after (str, optional): Cursor of the last row on the previous
+                page.
+            before (str, optional): Cursor of the first row on the next
+                page.
+
+        Returns:
+            CatalogPage: The requested page.
+        """
+        try:
+            number = self.validate_number(number)
+        except PageNotAnInteger:
+            number = 1
+        except EmptyPage:
+            number = self.num_pages
+
+        if self.ordering:
+            signature = self.catalog_query.signature
+            cursor, forward = (after, True) if after else (before, False)
+            values = decode_cursor(cursor, signature) if cursor else None
+            if values is not None and len(values) == len(self.ordering):
+                return self._seek_page(number, values, forward)
+            if number > (self.num_pages + 1) // 2:
+                return self._reverse_page(number)
+
+        return self._offset_page(number)
+
+    def _offset_page(self, number):
+        """Fetch a page with OFFSET from the start of the ordering."""
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom : bottom + self.per_page])
+        return CatalogPage(items, number, self)
+
+    def _reverse_page(self, number):
+        """Fetch a page with OFFSET from the end of the ordering."""
+        top = min(number * self.per_page, self.count)
+        bottom = (number - 1) * self.per_page
+        from_end = self.count - top
+        reversed_list = self.object_list.order_by(
+            *order_by(self.ordering, reverse=True)
+        )
+        items = list(reversed_list[from_end : from_end + top - bottom])
+        items.reverse()
+        return CatalogPage(items, number, self)
+
+    def _seek_page(self, number, values, forward):
+        """Fetch a page with a keyset condition next to a cursor."""
+        queryset = self.object_list.filter(
+            seek_filter(self.ordering, values, forward)
+        )
+        if not forward:
+            queryset = queryset.order_by(
+                *order_by(self.ordering, reverse=True)
+            )
+        items = list(queryset[: self.per_page])
+        if not forward:
+            items.reverse()
+        return CatalogPage(items, number, self)
+
+
+class CatalogPage(Page):
+    """
+    A catalog page exposing keyset cursors for its neighbours.
+    """
+
+    def _cursor(self, product):
+        """Encodes the position of `product` in the current ordering."""
+        return encode_cursor(
+            self.paginator.ordering,
+            product,
+            self.paginator.catalog_query.signature,
+        )
+
+    @property
+    def next_cursor(self):
+        """Cursor for fetching the next page, if keyset is available."""
+        if self.paginator.ordering and self.object_list:
+            return self._cursor(self.object_list[-1])
+        return ""
+
+    @property
+    def previous_cursor(self):
+        """Cursor for fetching the previous page, if keyset is available."""
+        if self.paginator.ordering and self.object_list:
+            return self._cursor(self.object_list[0])
+        return ""
+
+    @property
+    def page_window(self):
+        """Page numbers to link to around this page."""
+        return self.paginator.page_window(self.number)
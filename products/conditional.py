@@ -0,0 +1,165 @@
+"""
+Conditional GET validators for the catalog and product detail pages.
+
+The functions in this module are used with Django's `condition`
+decorator, so a request whose `If-None-Match` / `If-Modified-Since`
+matches is answered with 304 before the view runs (no queryset, no
+template, no context processors).
+
+Validators:
+- Product detail: the product's and its category's `updated_at`.
+- Catalog: the latest `updated_at` of products and categories, and the
+  number of products, combined with the filter signature of the page.
+  Deleting a product touches its category, so deletions also move the
+  last modified time forward. The whole catalog is used rather than
+  only the filtered products, as every page shows catalog-wide facet
+  counts.
+
+Pages also show the viewer's bag, login state, wishlist and owner-only
+links, so the ETag includes a digest of those. `Last-Modified` is only sent to
+anonymous visitors with an empty bag, whose page depends on the catalog
+alone. Requests with pending flash messages always get a full response.
+
+Promotional prices are brought up to date before the validators are
+computed, so a promotion starting or ending today changes them.
+"""
+
+import hashlib
+import json
+
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max
+
+from .catalog import CatalogQuery
+from .models import Category, Product
+from .promotions import ensure_effective_prices_current
+from .wishlists import get_wishlist_ids
+
+
+def _viewer_state(request):
+    """
+    Describe the parts of a page that depend on the viewer.
+
+    Args:
+        request (HttpRequest): The incoming request.
+
+    Returns:
+        tuple or None: The viewer state, or None if the page must be
+            rendered (pending messages).
+    """
+    if len(get_messages(request)):
+        return None
+    user = request.user
+    bag = request.session.get("bag", {})
+    return (
+        user.pk if user.is_authenticated else None,
+        user.is_superuser,
+        json.dumps(bag, sort_keys=True) if bag else "",
+        tuple(sorted(get_wishlist_ids(user))),
+    )
+
+
+def _is_shared(state):
+    """Returns True if the page does not depend on the viewer."""
+    return state == (None, False, "", ())
+
+
+def _make_etag(*parts):
+    """Returns a strong ETag built from the given validator parts."""
+    payload = json.dumps(parts, default=str)
+    return f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def _catalog_validators(request):
+    """
+    Compute (once per request) the validators for the catalog page.
+
+    Args:
+        request (HttpRequest): The incoming request.
+
+    Returns:
+        tuple or None: The ETag and last modified time, or None if the
+            page must be rendered.
+    """
+    if not hasattr(request, "_catalog_validators"):
+        ensure_effective_prices_current()
+        state = _viewer_state(request)
+        if state is None or ("q" in request.GET and not request.GET["q"]):
+            request._catalog_validators = None
+        else:
+            products = Product.objects.aggregate(
+                latest=Max("updated_at"), count=Count("pk")
+            )
+            categories = Category.objects.aggregate(latest=Max("updated_at"))
+            last_modified = max(
+                filter(None, [products["latest"], categories["latest"]]),
+                default=None,
+            )
+            etag = _make_etag(
+                "catalog",
+                CatalogQuery.from_request(request).signature,
+                products["latest"],
+                products["count"],
+                categories["latest"],
+                state,
+            )
+            request._catalog_validators = (
+                etag,
+                last_modified if _is_shared(state) else None,
+            )
+    return request._catalog_validators
+
+
+def catalog_etag(request, *args, **kwargs):
+    """Returns the ETag of the catalog page."""
+    validators = _catalog_validators(request)
+    return validators[0] if validators else None
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    """Returns the last modified time of the catalog page, if shared."""
+    validators = _catalog_validators(request)
+    return validators[1] if validators else None
+
+
+def _product_validators(request, product_id):
+    """
+    Compute (once per request) the validators for a product page.
+
+    Args:
+        request (HttpRequest): The incoming request.
+        product_id (int): The product's primary key.
+
+    Returns:
+        tuple or None: The ETag and last modified time, or None if the
+            page must be rendered.
+    """
+    if not hasattr(request, "_product_validators"):
+        ensure_effective_prices_current()
+        state = _viewer_state(request)
+        row = (
+            Product.objects.filter(pk=product_id)
+            .values_list("updated_at", "category__updated_at")
+            .first()
+        )
+        if state is None or row is None:
+            request._product_validators = None
+        else:
+            last_modified = max(filter(None, row), default=None)
+            request._product_validators = (
+                _make_etag("product", product_id, *row, state),
+                last_modified if _is_shared(state) else None,
+            )
+    return request._product_validators
+
+
+def product_etag(request, product_id, *args, **kwargs):
+    """Returns the ETag of a product detail page."""
+    validators = _product_validators(request, product_id)
+    return validators[0] if validators else None
+
+
+def product_last_modified(request, product_id, *args, **kwargs):
+    """Returns the last modified time of a product page, if shared."""
+    validators = _product_validators(request, product_id)
+    return validators[1] if validators else None
@@ -0,0 +1,339 @@
+"""
+Precomputed facet counts for the product catalog.
+
+The facet index (`ProductFacetCount`) holds one row per combination of
+category, price bucket and rating bucket, with the number of products
+in it. It is a few hundred rows at most, so facet counts for any
+combination of selected facets are summed from it in Python instead of
+running a `GROUP BY` over the product table on each page view.
+
+Key Features:
+- Updated incrementally from `Product` save/delete signals.
+- Disjunctive counts: each facet is counted with the other facets'
+  selections applied, but not its own.
+- Search results are counted from the matching products, as the index
+  cannot know which products match a query.
+
+Usage:
+    python manage.py rebuild_facet_counts
+"""
+
+from collections import Counter
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from store_settings.cache import get_currency
+
+from .models import Category, Product, ProductFacetCount
+
+PRICE_BUCKETS = [
+    (Decimal("0"), Decimal("10")),
+    (Decimal("10"), Decimal("25")),
+    (Decimal("25"), Decimal("50")),
+    (Decimal("50"), Decimal("100")),
+    (Decimal("100"), None),
+]
+"""Price ranges as `(low, high)` pairs; `high` is exclusive."""
+
+MAX_RATING = 5
+"""The highest whole-star rating bucket."""
+
+NOT_RATED = "none"
+"""The `rating` query value selecting products without a rating."""
+
+
+def price_bucket(price):
+    """
+    Return the index of the price bucket containing a price.
+
+    Args:
+        price (Decimal): The product price.
+
+    Returns:
+        int: The index into `PRICE_BUCKETS`.
+    """
+    price = Decimal(str(price))
+    for index, (low, high) in enumerate(PRICE_BUCKETS):
+        if high is None or price < high:
+            return index
+    return len(PRICE_BUCKETS) - 1
+
+
+def rating_bucket(rating):
+    """
+    Return the whole-star bucket for a rating.
+
+    Args:
+        rating (Decimal): The product rating, or None.
+
+    Returns:
+        int or None: The number of whole stars, or None if not rated.
+    """
+    if rating is None:
+        return None
+    return max(0, min(int(Decimal(str(rating))), MAX_RATING))
+
+
+def cell_key(category_id, price, rating):
+    """
+    Return the facet cell for a product's category, price and rating.
+
+    Args:
+        category_id (int): The product's category id, or None.
+        price (Decimal): The product price.
+        rating (Decimal): The product rating, or None.
+
+    Returns:
+        tuple: `(category_id, price_bucket, rating_bucket)`.
+    """
+    return (category_id, price_bucket(price), rating_bucket(rating))
+
+
+def product_cell(product):
+    """Returns the facet cell of a `Product` instance."""
+    return cell_key(product.category_id, product.price, product.rating)
+
+
+def count_cells(rows):
+    """
+    Count products per facet cell.
+
+    Args:
+        rows (Iterable[tuple]): `(category_id, price, rating)` rows.
+
+    Returns:
+        Counter: The number of products keyed by facet cell.
+    """
+    return Counter(cell_key(*row) for row in rows)
+
+
+def adjust_facet_count(cell, delta):
+    """
+    Add `delta` to the count of a facet cell, creating it if needed.
+
+    Args:
+        cell (tuple): `(category_id, price_bucket, rating_bucket)`.
+        delta (int): The change in the number of products.
+    """
+    category_id, price_index, rating_index = cell
+    rows = ProductFacetCount.objects.filter(
+        category_id=category_id,
+        price_bucket=price_index,
+        rating_bucket=rating_index,
+    )
+    if rows.update(count=F("count") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ProductFacetCount.objects.create(
+                category_id=category_id,
+                price_bucket=price_index,
+                rating_bucket=rating_index,
+                count=delta,
+            )
+    except IntegrityError:
+        # Created concurrently; add to the existing row instead
+        rows.update(count=F("count") + delta)
+
+
+def rebuild_facet_counts():
+    """
+    Recount the whole facet index from the product table.
+
+    Returns:
+        int: The number of facet cells written.
+    """
+    cells = count_cells(
+        Product.objects.values_list("category_id", "price", "rating")
+        .order_by()
+        .iterator(chunk_size=2000)
+    )
+    with transaction.atomic():
+        ProductFacetCount.objects.all().delete()
+        ProductFacetCount.objects.bulk_create(
+            [
+                ProductFacetCount(
+                    category_id=category_id,
+                    price_bucket=price_index,
+                    rating_bucket=rating_index,
+                    count=count,
+                )
+                for (
+                    category_id,
+                    price_index,
+                    rating_index,
+                ), count in cells.items()
+            ]
+        )
+    return len(cells)
+
+
+def price_label(index):
+    """Returns the display label for a price bucket."""
+    symbol = {"eur": "€", "gbp": "£", "usd": "$"}.get(get_currency(), "")
+    low, high = PRICE_BUCKETS[index]
+    if not low:
+        return f"Under {symbol}{high}"
+    if high is None:
+        return f"{symbol}{low} and over"
+    return f"{symbol}{low} to {symbol}{high}"
+
+
+def rating_label(index):
+    """Returns the display label for a rating bucket."""
+    if index is None:
+        return "Not rated"
+    return f"{index} star{'' if index == 1 else 's'}"
+
+
+def _load_cells(catalog_query):
+    """
+    Load the facet cells and categories relevant to a catalog query.
+
+    Args:
+        catalog_query (CatalogQuery): The current catalog query.
+
+    Returns:
+        tuple: The cell counts and a mapping of id to `Category`.
+    """
+    if catalog_query.query:
+        # Count the products matching the search, ignoring facet filters
+        matches = type(catalog_query)(query=catalog_query.query).queryset()
+        cells = count_cells(
+            matches.order_by().values_list("category_id", "price", "rating")
+        )
+        categories = Category.objects.in_bulk(
+            [cell[0] for cell in cells if cell[0] is not None]
+        )
+        return cells, categories
+
+    cells = Counter()
+    categories = {}
+    for row in ProductFacetCount.objects.filter(count__gt=0).select_related(
+        "category"
+    ):
+        cells[
+            (row.category_id, row.price_bucket, row.rating_bucket)
+        ] += row.count
+        if row.category is not None:
+            categories[row.category_id] = row.category
+    return cells, categories
+
+
+def get_facets(catalog_query, params):
+    """
+    Build the category, price and rating facets for the catalog sidebar.
+
+    Args:
+        catalog_query (CatalogQuery): The current catalog query.
+        params (QueryDict): The request's query parameters, used to build
+            the facet links.
+
+    Returns:
+        dict: A dictionary containing:
+            - `categories`, `prices`, `ratings`: Lists of facet options,
+              each with a `label`, `count`, `selected` flag and `query`
+              string that toggles the option.
+            - `groups`: The three option lists, in display order.
+            - `current_categories`: The selected `Category` instances.
+    """
+    cells, categories = _load_cells(catalog_query)
+
+    selected_categories = {
+        category.pk
+        for category in categories.values()
+        if category.name in catalog_query.categories
+    }
+    selections = [
+        selected_categories if catalog_query.categories else None,
+        ({catalog_query.price} if catalog_query.price is not None else None),
+        (
+            {catalog_query.rating_bucket}
+            if catalog_query.rating is not None
+            else None
+        ),
+    ]
+
+    def counts(position):
+        """Count the values of one facet under the other selections."""
+        totals = Counter()
+        for cell, count in cells.items():
+            if all(
+                selected is None or cell[other] in selected
+                for other, selected in enumerate(selections)
+                if other != position
+            ):
+                totals[cell[position]] += count
+        return totals
+
+    def option(name, value, label, count, selected):
+        """Build one facet option and the link that toggles it."""
+        query = params.copy()
+        for key in ("page", "after", "before", name):
+            query.pop(key, None)
+        if not selected:
+            query[name] = value
+        return {
+            "label": label,
+            "count": count,
+            "selected": selected,
+            "query": query.urlencode(),
+        }
+
+    category_counts = counts(0)
+    price_counts = counts(1)
+    rating_counts = counts(2)
+
+    category_options = sorted(
+        (
+            option(
+                "category",
+                category.name,
+                category.friendly_name or category.name,
+                category_counts[category.pk],
+                category.pk in selected_categories,
+            )
+            for category in categories.values()
+            if category_counts[category.pk]
+            or category.pk in selected_categories
+        ),
+        key=lambda item: item["label"].lower(),
+    )
+    price_options = [
+        option(
+            "price",
+            str(index),
+            price_label(index),
+            price_counts[index],
+            catalog_query.price == index,
+        )
+        for index in range(len(PRICE_BUCKETS))
+        if price_counts[index] or catalog_query.price == index
+    ]
+    rating_options = [
+        option(
+            "rating",
+            NOT_RATED if index is None else str(index),
+            rating_label(index),
+            rating_counts[index],
+            catalog_query.rating is not None
+            and catalog_query.rating_bucket == index,
+        )
+        for index in [*range(MAX_RATING, -1, -1), None]
+        if rating_counts[index]
+        or (
+            catalog_query.rating is not None
+            and catalog_query.rating_bucket == index
+        )
+    ]
+
+    return {
+        "categories": category_options,
+        "prices": price_options,
+        "ratings": rating_options,
+        "groups": [category_options, price_options, rating_options],
+        "current_categories": [
+            categories[pk] for pk in sorted(selected_categories)
+        ],
+    }
@@ -7,6 +7,7 @@ products in the store.
 
 from django import forms
 from .widgets import CustomClearableFileInput
+from .images import refresh_product_variants
 from .models import Product, Category
 
 
@@ -46,3 +47,19 @@ class ProductForm(forms.ModelForm):
         # Apply a uniform class to all fields for styling consistency
         for field_name, field in self.fields.items():
             field.widget.attrs["class"] = "border-black rounded-0"
+
+    def save(self, commit=True):
+        """
+        Saves the product, regenerating its image variants if the image
+        was uploaded, replaced or cleared.
+
+        Args:
+            commit (bool): Whether to save the product to the database.
+
+        Returns:
+            Product: The product instance.
+        """
+        product = super().save(commit=commit)
+        if commit and "image" in self.changed_data:
+            refresh_product_variants(product)
+        return product
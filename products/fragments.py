@@ -0,0 +1,181 @@
+"""
+Versioned fragment cache for the catalog's product cards.
+
+Each product card (image, name, price, category link and rating) is
+rendered once and cached under a key made of the product id, a
+per-product version and a per-category version. The versions are bumped
+from `Product`, `Category` and `Promotion` signals, so an edit simply
+moves the card to a new key and the old fragment expires unused.
+
+Key Features:
+- One `get_many` for the versions and one for the fragments per page.
+- Only the cards that missed are rendered, then stored with `set_many`.
+- Hit and miss counters, readable with `get_card_cache_stats()`.
+
+Per-user parts of the card (edit links and the wishlist form with its
+CSRF token) are not cached and are rendered by the catalog template.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+CARD_TEMPLATE = "products/includes/product_card.html"
+"""Template rendering the cacheable part of a product card."""
+
+HITS_KEY = "products:card_cache:hits"
+"""Cache key counting product card cache hits."""
+
+MISSES_KEY = "products:card_cache:misses"
+"""Cache key counting product card cache misses."""
+
+
+def _version_key(kind, pk):
+    """Returns the cache key holding a product or category version."""
+    return f"products:card_version:{kind}:{pk}"
+
+
+def _bump(key):
+    """Increment a version, starting a new one if it has expired."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_product_versions(product_ids):
+    """
+    Invalidate the cached cards of the given products.
+
+    Args:
+        product_ids (Iterable[int]): The primary keys of the products.
+    """
+    for product_id in product_ids:
+        _bump(_version_key("product", product_id))
+
+
+def bump_category_version(category_id):
+    """
+    Invalidate the cached cards of every product in a category.
+
+    Args:
+        category_id (int): The primary key of the category.
+    """
+    _bump(_version_key("category", category_id))
+
+
+def _get_versions(keys):
+    """
+    Fetch versions, starting missing ones at an unused value.
+
+    A missing version never restarts at a fixed number, so fragments
+    cached under an evicted version cannot be served again.
+
+    Args:
+        keys (list): The version cache keys.
+
+    Returns:
+        dict: The version for each key.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Another request may have started the version first
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def _card_key(product, versions):
+    """Returns the fragment cache key for a product card."""
+    product_version = versions[_version_key("product", product.pk)]
+    category_version = (
+        versions[_version_key("category", product.category_id)]
+        if product.category_id
+        else 0
+    )
+    return (
+        f"products:card:{product.pk}:{product_version}:"
+        f"{product.category_id}:{category_version}"
+    )
+
+
+def _count(key, amount):
+    """Add `amount` to a hit/miss counter."""
+    if not amount:
+        return
+    if not cache.add(key, amount, timeout=None):
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, timeout=None)
+
+
+def render_product_cards(products):
+    """
+    Return the cached card fragment for each product, rendering misses.
+
+    Args:
+        products (Iterable[Product]): The products on the page, with
+            their categories loaded.
+
+    Returns:
+        list: `(product, html)` pairs, in the order given.
+    """
+    products = list(products)
+    if not products:
+        return []
+
+    version_keys = [_version_key("product", p.pk) for p in products]
+    version_keys += [
+        _version_key("category", category_id)
+        for category_id in {p.category_id for p in products}
+        if category_id
+    ]
+    versions = _get_versions(version_keys)
+
+    keys = [_card_key(product, versions) for product in products]
+    fragments = cache.get_many(keys)
+
+    missed = {}
+    for product, key in zip(products, keys):
+        if key not in fragments:
+            missed[key] = render_to_string(
+                CARD_TEMPLATE,
+                {"product": product, "MEDIA_URL": settings.MEDIA_URL},
+            )
+    if missed:
+        cache.set_many(
+            missed,
+            timeout=getattr(settings, "PRODUCT_CARD_CACHE_TIMEOUT", 86400),
+        )
+        fragments.update(missed)
+
+    _count(HITS_KEY, len(products) - len(missed))
+    _count(MISSES_KEY, len(missed))
+
+    return [
+        (product, mark_safe(fragments[key]))
+        for product, key in zip(products, keys)
+    ]
+
+
+def get_card_cache_stats():
+    """
+    Return the product card cache hit and miss counters.
+
+    Returns:
+        dict: `hits`, `misses` and `hit_rate` (None before any lookup).
+    """
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+    }
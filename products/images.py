@@ -0,0 +1,298 @@
+"""
+Resized image variants for product images.
+
+Catalog cards show product images in 200x200 slots, so serving the
+original upload wastes most of the bytes on mobile. For each uploaded
+image this module renders a few widths in modern formats (WebP, AVIF
+when Pillow supports it) plus a JPEG fallback, and stores them next to
+the original through the configured storage backend.
+
+What was generated is recorded on `Product.image_variants`, so templates
+build `srcset` attributes (see `templatetags/product_images.py`) without
+asking the storage which files exist.
+
+Key Features:
+- Variants are never upscaled; small originals get a single width.
+- JPEG images are decoded at a reduced scale (`Image.draft`) when
+  possible, which makes large photos much cheaper to shrink.
+- `generate_variants` only uses the storage and Pillow, so it can run in
+  a worker process (see the `generate_image_variants` command).
+
+Usage:
+    python manage.py generate_image_variants --workers 8
+"""
+
+import io
+import logging
+import posixpath
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage, storages
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (200, 400, 800)
+"""Widths (in pixels) rendered for each image: 1x, 2x and detail."""
+
+VARIANTS_DIR = "variants"
+"""Storage directory holding the generated variants."""
+
+FORMAT_OPTIONS = {
+    "avif": ("AVIF", "image/avif", {"quality": 55}),
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": (
+        "JPEG",
+        "image/jpeg",
+        {"quality": 82, "optimize": True, "progressive": True},
+    ),
+}
+"""Pillow format, MIME type and save options for each variant format."""
+
+_worker_storage = None
+"""Storage used by worker processes (see `init_worker`)."""
+
+
+def variant_formats():
+    """
+    Return the formats to render, preferred first.
+
+    AVIF is only included if the installed Pillow can write it. JPEG is
+    always last, as the fallback for browsers without `<picture>`
+    support.
+
+    Returns:
+        list: Format names, keys of `FORMAT_OPTIONS`.
+    """
+    Image.init()
+    formats = [
+        name
+        for name in getattr(
+            settings, "PRODUCT_IMAGE_FORMATS", ("avif", "webp")
+        )
+        if name in FORMAT_OPTIONS and FORMAT_OPTIONS[name][0] in Image.SAVE
+    ]
+    return [*formats, "jpeg"]
+
+
+def variant_name(source, width, fmt):
+    """
+    Return the storage name of a variant.
+
+    Args:
+        source (str): The storage name of the original image.
+        width (int): The variant width.
+        fmt (str): The variant format.
+
+    Returns:
+        str: e.g. `variants/toy-200w.webp` for `toy.jpg`.
+    """
+    stem = posixpath.splitext(source)[0]
+    return f"{VARIANTS_DIR}/{stem}-{width}w.{fmt}"
+
+
+def variant_url(source, width, fmt):
+    """Returns the public URL of a variant."""
+    return default_storage.url(variant_name(source, width, fmt))
+
+
+def _open(storage, source, width):
+    """
+    Open an image for resizing to `width` pixels.
+
+    Args:
+        storage (Storage): The storage holding the image.
+        source (str): The storage name of the image.
+        width (int): The largest width that will be rendered.
+
+    Returns:
+        Image: The decoded, upright image.
+    """
+    with storage.open(source, "rb") as original:
+        image = Image.open(io.BytesIO(original.read()))
+    # Let the JPEG decoder downscale by a power of two where possible
+    image.draft("RGB", (width, width * image.height // image.width))
+    return ImageOps.exif_transpose(image)
+
+
+def _encode(image, fmt):
+    """
+    Encode an image in a variant format.
+
+    Args:
+        image (Image): The resized image.
+        fmt (str): The variant format.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    pillow_format, _, options = FORMAT_OPTIONS[fmt]
+    if fmt == "jpeg" and image.mode != "RGB":
+        # JPEG has no alpha channel; flatten transparency onto white
+        background = Image.new("RGB", image.size, "white")
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(source, storage=None):
+    """
+    Render and store the variants of an image.
+
+    Existing variants with the same names are replaced.
+
+    Args:
+        source (str): The storage name of the original image.
+        storage (Storage, optional): The storage to use. Defaults to the
+            worker's storage, or `default_storage` in the web process.
+
+    Returns:
+        dict: The variant description stored on `Product.image_variants`:
+            `source`, `widths` and `formats`.
+    """
+    storage = storage or _worker_storage or default_storage
+    formats = variant_formats()
+    image = _open(storage, source, max(VARIANT_WIDTHS))
+    widths = sorted({min(width, image.width) for width in VARIANT_WIDTHS})
+
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            name = variant_name(source, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(_encode(resized, fmt)))
+
+    return {
+        "source": source,
+        "widths": widths,
+        "formats": formats,
+    }
+
+
+def delete_variants(variants, storage=None):
+    """
+    Delete the stored variants described by `variants`.
+
+    Args:
+        variants (dict): A `Product.image_variants` value.
+        storage (Storage, optional): The storage to use.
+    """
+    storage = storage or default_storage
+    source = variants.get("source")
+    if not source:
+        return
+    for width in variants.get("widths", []):
+        for fmt in variants.get("formats", []):
+            try:
+                storage.delete(variant_name(source, width, fmt))
+            except OSError:
+                logger.warning("Could not delete a variant of %s", source)
+
+
+def has_current_variants(variants, source):
+    """
+    Check whether `variants` were generated from the image `source`.
+
+    Args:
+        variants (dict): A `Product.image_variants` value.
+        source (str): The product's current image name.
+
+    Returns:
+        bool: True if the variants match the current image.
+    """
+    return bool(source) and bool(variants) and variants["source"] == source
+
+
+def record_variants(variants_by_product):
+    """
+    Store generated variants on their products.
+
+    The products get a new `updated_at` and card version, so conditional
+    GET and the card fragment cache pick up the new markup.
+
+    Args:
+        variants_by_product (dict): `Product.image_variants` values keyed
+            by product id.
+    """
+    # Imported here so worker processes can import this module before
+    # Django is set up
+    from .fragments import bump_product_versions
+    from .models import Product
+
+    if not variants_by_product:
+        return
+    now = timezone.now()
+    products = list(Product.objects.filter(pk__in=variants_by_product))
+    for product in products:
+        product.image_variants = variants_by_product[product.pk]
+        product.updated_at = now
+    Product.objects.bulk_update(products, ["image_variants", "updated_at"])
+    bump_product_versions(variants_by_product)
+
+
+def refresh_product_variants(product):
+    """
+    Regenerate a product's variants after its image changed.
+
+    Variants of the previous image are deleted. Failures are logged and
+    leave the product without variants, so the original image is shown.
+
+    Args:
+        product (Product): The saved product.
+    """
+    previous = product.image_variants
+    variants = {}
+    if product.image:
+        try:
+            variants = generate_variants(product.image.name)
+        except Exception:  # noqa: BLE001 - never fail the product save
+            logger.exception("Could not generate variants for %s", product)
+    if previous and previous.get("source") != variants.get("source"):
+        delete_variants(previous)
+    record_variants({product.pk: variants})
+    product.image_variants = variants
+
+
+def init_worker():
+    """
+    Prepare a worker process of the variant process pool.
+
+    Each worker gets its own storage instance, so network connections
+    (e.g. to S3) are never shared with the parent process.
+    """
+    global _worker_storage
+    django.setup()
+    _worker_storage = storages.create_storage(settings.STORAGES["default"])
+
+
+def generate_variants_task(product_id, source, previous=None):
+    """
+    Generate the variants of one product image (in a worker process).
+
+    Args:
+        product_id (int): The product's id.
+        source (str): The storage name of the product image.
+        previous (dict, optional): The product's current
+            `image_variants`; deleted if made from another image.
+
+    Returns:
+        tuple: `(product_id, variants)`, with `variants` None on failure.
+    """
+    try:
+        variants = generate_variants(source)
+    except Exception:  # noqa: BLE001 - one bad image must not stop a run
+        logger.exception("Could not generate variants for %s", source)
+        return product_id, None
+    if previous and previous.get("source") != source:
+        delete_variants(previous, _worker_storage)
+    return product_id, variants
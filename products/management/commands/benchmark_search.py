@@ -0,0 +1,178 @@
+"""
+Management command to benchmark product search over a generated catalog.
+
+The command generates a synthetic catalog inside a transaction, indexes
+it, and times the configured search backend against the old
+`icontains` scan. The transaction is rolled back afterwards, so the
+database is left untouched.
+
+Usage:
+    python manage.py benchmark_search --products 200000 --runs 20
+"""
+
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from products.models import Category, Product
+from products.search import get_search_backend
+
+WORDS = [
+    "cotton",
+    "denim",
+    "summer",
+    "winter",
+    "jacket",
+    "dress",
+    "shirt",
+    "hoodie",
+    "knit",
+    "floral",
+    "striped",
+    "organic",
+    "wool",
+    "rain",
+    "boots",
+    "sneakers",
+    "pyjamas",
+    "party",
+    "school",
+    "cosy",
+    "light",
+    "soft",
+    "bright",
+    "pastel",
+    "classic",
+    "sport",
+    "explorer",
+    "puffer",
+]
+
+QUERIES = ["denim jacket", "organic cotton", "party dress", "wool", "rain"]
+
+
+class Rollback(Exception):
+    """Raised to roll back the generated catalog."""
+
+
+class Command(BaseCommand):
+    """
+    Benchmark full-text search against the `icontains` baseline.
+
+    Reports per-query latency percentiles (milliseconds) as JSON.
+    """
+
+    help = "Benchmark product search over a generated catalog."
+
+    def add_arguments(self, parser):
+        """
+        Adds command-line arguments.
+
+        Args:
+            parser (ArgumentParser): The argument parser.
+        """
+        parser.add_argument("--products", type=int, default=20000)
+        parser.add_argument("--runs", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def _generate_catalog(self, count, seed, chunk_size):
+        """
+        Create `count` products with random names and descriptions.
+
+        Args:
+            count (int): The number of products to create.
+            seed (int): Seed for the random generator.
+            chunk_size (int): The `bulk_create` batch size.
+        """
+        rng = random.Random(seed)
+        categories = [
+            Category.objects.create(
+                name=f"bench_{i}", friendly_name=f"Bench {i}"
+            )
+            for i in range(10)
+        ]
+        backend = get_search_backend()
+
+        for start in range(0, count, chunk_size):
+            batch = [
+                Product(
+                    category=rng.choice(categories),
+                    sku=f"BENCH{start + i}",
+                    name=" ".join(rng.sample(WORDS, 3)).title(),
+                    description=" ".join(rng.choices(WORDS, k=40)),
+                    price=rng.randint(5, 120),
+                )
+                for i in range(min(chunk_size, count - start))
+            ]
+            # bulk_create skips post_save, so index explicitly
+            backend.index_products(Product.objects.bulk_create(batch))
+
+    @staticmethod
+    def _time(queryset_factory, runs):
+        """
+        Time counting the results and fetching the first page for each
+        query, as the paginated catalog does.
+
+        Args:
+            queryset_factory (Callable): Builds a queryset from a query.
+            runs (int): How many times to repeat each query.
+
+        Returns:
+            dict: Latency percentiles in milliseconds.
+        """
+        timings = []
+        for _ in range(runs):
+            for query in QUERIES:
+                start = time.perf_counter()
+                queryset = queryset_factory(query)
+                queryset.count()
+                list(queryset[:24])
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return {
+            "p50": round(statistics.median(timings), 2),
+            "p95": round(timings[int(len(timings) * 0.95) - 1], 2),
+            "max": round(timings[-1], 2),
+        }
+
+    def handle(self, *args, **options):
+        """
+        Executes the command.
+
+        Args:
+            *args: Positional arguments.
+            **options: Parsed command-line options.
+        """
+        backend = get_search_backend()
+        results = {}
+
+        try:
+            with transaction.atomic():
+                self._generate_catalog(
+                    options["products"], options["seed"], options["chunk_size"]
+                )
+                products = Product.objects.all()
+                results = {
+                    "backend": backend.__class__.__name__,
+                    "products": options["products"],
+                    "search_ms": self._time(
+                        lambda q: backend.search(products, q), options["runs"]
+                    ),
+                    "icontains_ms": self._time(
+                        lambda q: products.filter(
+                            Q(name__icontains=q) | Q(description__icontains=q)
+                        ),
+                        options["runs"],
+                    ),
+                }
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(json.dumps(results, indent=2))
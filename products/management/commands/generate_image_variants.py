@@ -0,0 +1,134 @@
+"""
+Management command to generate resized variants of product images.
+
+Usage:
+    python manage.py generate_image_variants [--workers 8]
+        [--chunk-size 500] [--force]
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+
+from products.images import (
+    generate_variants_task,
+    has_current_variants,
+    init_worker,
+    record_variants,
+)
+from products.models import Product
+
+
+class Command(BaseCommand):
+    """
+    Generate the image variants of every product that lacks them.
+
+    Products are processed in primary key order, in chunks, across a pool
+    of worker processes. The variants of each chunk are saved as soon as
+    it completes and products with current variants are skipped, so an
+    interrupted run can simply be started again.
+    """
+
+    help = "Generate resized WebP/AVIF/JPEG variants of product images."
+
+    def add_arguments(self, parser):
+        """
+        Adds command-line arguments.
+
+        Args:
+            parser (ArgumentParser): The argument parser.
+        """
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (0 to run in-process).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of products saved per batch.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants that are already current.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Executes the command.
+
+        Args:
+            *args: Positional arguments.
+            **options: Parsed command-line options.
+        """
+        workers = options["workers"]
+        pool = None
+        if workers > 0:
+            # Spawned workers share no database or storage connections
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=init_worker,
+            )
+
+        generated = failed = 0
+        try:
+            for tasks in self._chunks(
+                options["chunk_size"], options["force"]
+            ):
+                if pool is None:
+                    results = [generate_variants_task(*t) for t in tasks]
+                else:
+                    results = pool.map(generate_variants_task, *zip(*tasks))
+                variants = dict(results)
+                done = {pk: v for pk, v in variants.items() if v is not None}
+                record_variants(done)
+                generated += len(done)
+                failed += len(variants) - len(done)
+                self.stdout.write(f"{generated} generated, {failed} failed")
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated variants for {generated} images "
+                f"({failed} failed)."
+            )
+        )
+
+    def _chunks(self, chunk_size, force):
+        """
+        Yield the products needing variants, a chunk at a time.
+
+        Args:
+            chunk_size (int): Number of products read per query.
+            force (bool): Include products with current variants.
+
+        Yields:
+            list: `(product_id, image, image_variants)` tuples.
+        """
+        products = (
+            Product.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .order_by("pk")
+            .values_list("pk", "image", "image_variants")
+        )
+        last_pk = 0
+        while True:
+            chunk = list(products.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return
+            last_pk = chunk[-1][0]
+            tasks = [
+                row
+                for row in chunk
+                if force or not has_current_variants(row[2], row[1])
+            ]
+            if tasks:
+                yield tasks
@@ -0,0 +1,34 @@
+"""
+Management command to rebuild the promotional price table.
+
+Usage:
+    python manage.py rebuild_effective_prices
+"""
+
+from django.core.management.base import BaseCommand
+
+from products.promotions import rebuild_effective_prices
+
+
+class Command(BaseCommand):
+    """
+    Recompute every product's effective price from today's promotions.
+
+    Prices are also rebuilt on the first request of each day; scheduling
+    this command just after midnight moves that work off the request.
+    """
+
+    help = "Rebuild the effective (promotional) price of every product."
+
+    def handle(self, *args, **options):
+        """
+        Executes the command.
+
+        Args:
+            *args: Positional arguments.
+            **options: Parsed command-line options.
+        """
+        changed = rebuild_effective_prices()
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {changed} effective prices.")
+        )
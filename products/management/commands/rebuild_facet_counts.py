@@ -0,0 +1,35 @@
+"""
+Management command to rebuild the catalog facet index.
+
+Usage:
+    python manage.py rebuild_facet_counts
+"""
+
+from django.core.management.base import BaseCommand
+
+from products.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    """
+    Recount the facet index from the product table.
+
+    The index is kept up to date from `Product` signals; this command
+    repairs it after bulk changes that bypass them (e.g. `update()` or
+    `bulk_create()`).
+    """
+
+    help = "Rebuild the category, price and rating facet counts."
+
+    def handle(self, *args, **options):
+        """
+        Executes the command.
+
+        Args:
+            *args: Positional arguments.
+            **options: Parsed command-line options.
+        """
+        cells = rebuild_facet_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {cells} facet cells.")
+        )
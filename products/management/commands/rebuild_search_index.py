@@ -0,0 +1,65 @@
+"""
+Management command to rebuild the product search index.
+
+Usage:
+    python manage.py rebuild_search_index [--chunk-size 1000]
+"""
+
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the search document (and vendor index) for every product.
+
+    Products are processed in primary key order, in chunks, so the
+    command can be used to backfill large catalogs.
+    """
+
+    help = "Rebuild the full-text search index for all products."
+
+    def add_arguments(self, parser):
+        """
+        Adds command-line arguments.
+
+        Args:
+            parser (ArgumentParser): The argument parser.
+        """
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of products indexed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Executes the command.
+
+        Args:
+            *args: Positional arguments.
+            **options: Parsed command-line options.
+        """
+        backend = get_search_backend()
+        chunk_size = options["chunk_size"]
+        products = Product.objects.select_related("category").order_by("pk")
+
+        indexed = 0
+        last_pk = 0
+        while True:
+            chunk = list(products.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            backend.index_products(chunk)
+            indexed += len(chunk)
+            last_pk = chunk[-1].pk
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {indexed} products with "
+                f"{backend.__class__.__name__}."
+            )
+        )
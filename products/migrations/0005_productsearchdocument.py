@@ -0,0 +1,135 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:53
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+import products.models
+from django.db import migrations, models
+
+FTS_TABLE = "products_productsearch_fts"
+GIN_INDEX = "products_search_vector_gin"
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the vendor specific full-text index and backfill documents.
+
+    - PostgreSQL: a GIN index over the stored `search_vector`.
+    - SQLite: an FTS5 virtual table keyed by product id.
+    """
+    vendor = schema_editor.connection.vendor
+    table = "products_productsearchdocument"
+
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX {GIN_INDEX} ON {table} USING GIN (search_vector)"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(name, category, description)"
+        )
+
+    Product = apps.get_model("products", "Product")
+    ProductSearchDocument = apps.get_model(
+        "products", "ProductSearchDocument"
+    )
+    documents = []
+    for product in Product.objects.select_related("category").iterator():
+        category = product.category
+        documents.append(
+            ProductSearchDocument(
+                product_id=product.pk,
+                name=product.name or "",
+                category=(
+                    (category.friendly_name or category.name)
+                    if category
+                    else ""
+                ),
+                description=product.description or "",
+            )
+        )
+    ProductSearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"UPDATE {table} SET search_vector = "
+            "setweight(to_tsvector('english', name), 'A') || "
+            "setweight(to_tsvector('english', category), 'B') || "
+            "setweight(to_tsvector('english', description), 'C')"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, category, description) "
+            f"SELECT product_id, name, category, description FROM {table}"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the vendor specific full-text index."""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0004_promotion_wishlist"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSearchDocument",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("name", models.TextField(blank=True, default="")),
+                ("category", models.TextField(blank=True, default="")),
+                ("description", models.TextField(blank=True, default="")),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, null=True
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ProductSearchFTS",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_fts",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "document",
+                    products.models.FullTextField(
+                        db_column="products_productsearch_fts"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "products_productsearch_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
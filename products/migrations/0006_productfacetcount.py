@@ -0,0 +1,80 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from products.facets import count_cells
+
+
+def backfill_facet_counts(apps, schema_editor):
+    """Count the existing products into the facet index."""
+    Product = apps.get_model("products", "Product")
+    ProductFacetCount = apps.get_model("products", "ProductFacetCount")
+    cells = count_cells(
+        Product.objects.values_list("category_id", "price", "rating")
+        .order_by()
+        .iterator()
+    )
+    ProductFacetCount.objects.bulk_create(
+        [
+            ProductFacetCount(
+                category_id=category_id,
+                price_bucket=price_bucket,
+                rating_bucket=rating_bucket,
+                count=count,
+            )
+            for (category_id, price_bucket, rating_bucket), count in (
+                cells.items()
+            )
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0005_productsearchdocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFacetCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("price_bucket", models.PositiveSmallIntegerField()),
+                (
+                    "rating_bucket",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.category",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("category", "price_bucket", "rating_bucket"),
+                        name="unique_product_facet_cell",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            backfill_facet_counts, migrations.RunPython.noop
+        ),
+    ]
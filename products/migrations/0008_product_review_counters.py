@@ -0,0 +1,86 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+RATING_DESC_INDEX = "product_rating_desc_idx"
+
+
+def create_rating_desc_index(apps, schema_editor):
+    """
+    Create the index for sorting by rating, highest first.
+
+    The catalog sorts unrated products last in both directions. A plain
+    b-tree index covers `rating ASC NULLS LAST`; PostgreSQL needs this
+    one for `rating DESC NULLS LAST`. SQLite cannot declare it.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX {RATING_DESC_INDEX} ON products_product "
+            "(rating DESC NULLS LAST, id DESC)"
+        )
+
+
+def drop_rating_desc_index(apps, schema_editor):
+    """Drop the PostgreSQL rating index."""
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {RATING_DESC_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_category_updated_at_product_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="rating_1_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_2_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_3_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_4_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="rating_5_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="rating",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=6,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["rating", "id"], name="product_rating_idx"
+            ),
+        ),
+        migrations.RunPython(
+            create_rating_desc_index, drop_rating_desc_index
+        ),
+    ]
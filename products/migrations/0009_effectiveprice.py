@@ -0,0 +1,42 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0008_product_review_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EffectivePrice",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="effective_price",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "price",
+                    models.DecimalField(decimal_places=2, max_digits=6),
+                ),
+                ("valid_until", models.DateField()),
+                (
+                    "promotion",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="effective_prices",
+                        to="products.promotion",
+                    ),
+                ),
+            ],
+        ),
+    ]
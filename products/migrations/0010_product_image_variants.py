@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0009_effectiveprice"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
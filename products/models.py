@@ -5,8 +5,12 @@ This module defines the models for product categories, products, promotions,
 and wishlists.
 """
 
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import Lookup
+from django.utils import timezone
 
 
 class Category(models.Model):
@@ -28,6 +32,9 @@ class Category(models.Model):
     friendly_name = models.CharField(max_length=254, null=True, blank=True)
     """An optional user-friendly name for display purposes."""
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    """When the category was last changed (used for conditional GET)."""
+
     def __str__(self):
         """Returns the category name as a string."""
         return self.name
@@ -45,6 +52,13 @@ class Product(models.Model):
     name, description, price, rating, and optional images.
     """
 
+    class Meta:
+        indexes = [
+            # Keyset sort by rating; PostgreSQL also gets a
+            # `DESC NULLS LAST` index (migration 0008)
+            models.Index(fields=["rating", "id"], name="product_rating_idx"),
+        ]
+
     category = models.ForeignKey(
         "Category", null=True, blank=True, on_delete=models.SET_NULL
     )
@@ -66,9 +80,29 @@ class Product(models.Model):
     """The price of the product."""
 
     rating = models.DecimalField(
-        max_digits=6, decimal_places=2, null=True, blank=True
+        max_digits=6, decimal_places=2, null=True, blank=True, editable=False
     )
-    """The average user rating of the product (nullable)."""
+    """The average review rating of the product (null if not rated).
+
+    Maintained from `Review` signals; see `reviews.ratings`."""
+
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    """The number of product reviews, rated or not."""
+
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    """The number of 1 star reviews."""
+
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    """The number of 2 star reviews."""
+
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    """The number of 3 star reviews."""
+
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    """The number of 4 star reviews."""
+
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+    """The number of 5 star reviews."""
 
     image_url = models.URLField(max_length=1024, null=True, blank=True)
     """An optional URL to an external product image."""
@@ -76,10 +110,160 @@ class Product(models.Model):
     image = models.ImageField(null=True, blank=True)
     """An optional uploaded image for the product."""
 
+    image_variants = models.JSONField(default=dict, editable=False)
+    """The resized variants generated from `image` (see `images.py`)."""
+
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    """When the product was last changed (used for conditional GET)."""
+
     def __str__(self):
         """Returns the product name as a string."""
         return self.name
 
+    @property
+    def current_price(self):
+        """
+        Returns the price after any active promotion.
+
+        Load products with `select_related("effective_price")` to avoid
+        a query per product.
+        """
+        try:
+            effective = self.effective_price
+        except ObjectDoesNotExist:
+            return self.price
+        if effective.valid_until < timezone.localdate():
+            return self.price
+        return effective.price
+
+    @property
+    def rating_histogram(self):
+        """Returns `(stars, count)` pairs from 5 stars down to 1."""
+        return [
+            (stars, getattr(self, f"rating_{stars}_count"))
+            for stars in range(5, 0, -1)
+        ]
+
+
+class ProductSearchDocument(models.Model):
+    """
+    Represents the full-text search document for a product.
+
+    The document is kept up to date from `Product` and `Category` signals
+    and is read by the search backends in `products.search`.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        related_name="search_document",
+        on_delete=models.CASCADE,
+    )
+    """The product this search document describes."""
+
+    name = models.TextField(blank=True, default="")
+    """The product name, weighted highest when ranking."""
+
+    category = models.TextField(blank=True, default="")
+    """The friendly name of the product's category."""
+
+    description = models.TextField(blank=True, default="")
+    """The product description, weighted lowest when ranking."""
+
+    search_vector = SearchVectorField(null=True, blank=True)
+    """Precomputed `tsvector` (PostgreSQL only, GIN indexed)."""
+
+    def __str__(self):
+        """Returns a string representation of the search document."""
+        return f"Search document for {self.name}"
+
+
+class FullTextField(models.TextField):
+    """
+    Text field for the hidden column of an SQLite FTS5 table.
+
+    Supports the `match` lookup, which compiles to an FTS5 `MATCH`.
+    """
+
+
+@FullTextField.register_lookup
+class FullTextMatch(Lookup):
+    """Lookup compiling `field__match=...` to `<column> MATCH <query>`."""
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class ProductSearchFTS(models.Model):
+    """
+    Read-only view of the SQLite FTS5 search table.
+
+    The virtual table is created by a migration on SQLite only and is
+    written with raw SQL by `products.search.SQLiteSearchBackend`. This
+    unmanaged model lets the ORM join products against it.
+    """
+
+    class Meta:
+        managed = False
+        db_table = "products_productsearch_fts"
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_fts",
+        on_delete=models.DO_NOTHING,
+    )
+    """The indexed product (the FTS5 `rowid`)."""
+
+    document = FullTextField(db_column="products_productsearch_fts")
+    """The FTS5 hidden column, used to match against all columns."""
+
+
+class ProductFacetCount(models.Model):
+    """
+    Represents the number of products in one cell of the facet index.
+
+    Each row counts the products sharing a category, price bucket and
+    rating bucket. The rows are kept up to date incrementally from
+    `Product` signals and summed by `products.facets` to show facet
+    counts without grouping the whole product table.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "price_bucket", "rating_bucket"],
+                name="unique_product_facet_cell",
+            )
+        ]
+
+    category = models.ForeignKey(
+        Category, null=True, blank=True, on_delete=models.CASCADE
+    )
+    """The category of the counted products (null if uncategorized)."""
+
+    price_bucket = models.PositiveSmallIntegerField()
+    """The index of the price bucket (see `products.facets`)."""
+
+    rating_bucket = models.PositiveSmallIntegerField(null=True, blank=True)
+    """The whole-star rating bucket (null if not rated)."""
+
+    count = models.IntegerField(default=0)
+    """The number of products in this cell."""
+
+    def __str__(self):
+        """Returns a string representation of the facet cell."""
+        return (
+            f"{self.category_id}/{self.price_bucket}/"
+            f"{self.rating_bucket}: {self.count}"
+        )
+
 
 class Promotion(models.Model):
     """
@@ -112,6 +296,40 @@ class Promotion(models.Model):
         return self.name
 
 
+class EffectivePrice(models.Model):
+    """
+    Represents the current promotional price of a product.
+
+    One row exists per product with an active promotion, holding the
+    best discounted price. The table is rebuilt by `products.promotions`
+    when promotions change and when they start or end, and is read with
+    `select_related("effective_price")`.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        related_name="effective_price",
+        on_delete=models.CASCADE,
+    )
+    """The discounted product."""
+
+    price = models.DecimalField(max_digits=6, decimal_places=2)
+    """The product price after the promotion's discount."""
+
+    promotion = models.ForeignKey(
+        Promotion, related_name="effective_prices", on_delete=models.CASCADE
+    )
+    """The promotion giving the discount."""
+
+    valid_until = models.DateField()
+    """The last day the price applies (the promotion's end date)."""
+
+    def __str__(self):
+        """Returns a string representation of the effective price."""
+        return f"{self.product_id}: {self.price} until {self.valid_until}"
+
+
 class Wishlist(models.Model):
     """
     Represents a user's wishlist.
@@ -0,0 +1,148 @@
+"""
+Materialized promotional prices for products.
+
+`EffectivePrice` holds one row per product that has an active
+`Promotion`, with the discounted price, the promotion and the last day
+it applies. Everything that prices products (the catalog, the bag,
+order line items and the Stripe webhook) loads it with
+`select_related("effective_price")` and reads `Product.current_price`,
+so promotions cost no extra queries per item.
+
+Key Features:
+- Rebuilt from `Promotion` and `Product` signals (see `signals.py`).
+- Rebuilt at most once a day on first use, so promotions that start or
+  end take effect without a scheduler. Expired rows are ignored by
+  `Product.current_price` in any case.
+- Products whose price changes get a new `updated_at` and card version,
+  so conditional GET and the card fragment cache stay correct.
+
+Usage:
+    python manage.py rebuild_effective_prices
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .fragments import bump_product_versions
+from .models import EffectivePrice, Product, Promotion
+
+BUILT_ON_KEY = "products:effective_prices_built_on"
+"""Cache key holding the date the effective prices were last built."""
+
+
+def discounted_price(price, discount_percentage):
+    """
+    Apply a percentage discount to a price.
+
+    Args:
+        price (Decimal): The base price.
+        discount_percentage (int): The discount, from 0 to 100.
+
+    Returns:
+        Decimal: The discounted price, rounded to cents.
+    """
+    discount = min(max(discount_percentage, 0), 100)
+    return (Decimal(price) * (100 - discount) / 100).quantize(
+        Decimal("0.01")
+    )
+
+
+def rebuild_effective_prices(product_ids=None):
+    """
+    Rebuild the effective prices of all (or some) products.
+
+    For each product the promotion with the largest discount active
+    today is used.
+
+    Args:
+        product_ids (Iterable[int], optional): Restrict the rebuild to
+            these products.
+
+    Returns:
+        int: The number of products whose effective price changed.
+    """
+    today = timezone.localdate()
+    links = Promotion.products.through.objects.filter(
+        promotion__start_date__lte=today, promotion__end_date__gte=today
+    ).values_list(
+        "product_id",
+        "product__price",
+        "promotion_id",
+        "promotion__discount_percentage",
+        "promotion__end_date",
+    )
+    existing = EffectivePrice.objects.all()
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        links = links.filter(product_id__in=product_ids)
+        existing = existing.filter(product_id__in=product_ids)
+
+    best = {}
+    for product_id, price, promotion_id, discount, end_date in links:
+        current = best.get(product_id)
+        if current is None or (discount, -promotion_id) > current[0]:
+            best[product_id] = (
+                (discount, -promotion_id),
+                EffectivePrice(
+                    product_id=product_id,
+                    price=discounted_price(price, discount),
+                    promotion_id=promotion_id,
+                    valid_until=end_date,
+                ),
+            )
+    rows = {product_id: row for product_id, (_, row) in best.items()}
+
+    with transaction.atomic():
+        before = {
+            product_id: (price, promotion_id, valid_until)
+            for product_id, price, promotion_id, valid_until in (
+                existing.values_list(
+                    "product_id", "price", "promotion_id", "valid_until"
+                )
+            )
+        }
+        after = {
+            product_id: (row.price, row.promotion_id, row.valid_until)
+            for product_id, row in rows.items()
+        }
+        changed = [
+            product_id
+            for product_id in before.keys() | after.keys()
+            if before.get(product_id) != after.get(product_id)
+        ]
+        if changed:
+            EffectivePrice.objects.filter(product_id__in=changed).delete()
+            EffectivePrice.objects.bulk_create(
+                [rows[pk] for pk in changed if pk in rows]
+            )
+            Product.objects.filter(pk__in=changed).update(
+                updated_at=timezone.now()
+            )
+
+    if changed:
+        bump_product_versions(changed)
+        bump_catalog_version()
+    return len(changed)
+
+
+def ensure_effective_prices_current():
+    """
+    Rebuild the effective prices if they were not built today.
+
+    Called on the pricing paths, so promotions start and end on the
+    right day. Only the first caller of the day (per cache) rebuilds.
+    """
+    today = timezone.localdate().isoformat()
+    if cache.get(BUILT_ON_KEY) == today:
+        return
+    if not cache.add(f"{BUILT_ON_KEY}:lock", True, timeout=60):
+        return  # Another request is rebuilding
+    try:
+        rebuild_effective_prices()
+        cache.set(BUILT_ON_KEY, today, timeout=None)
+    finally:
+        cache.delete(f"{BUILT_ON_KEY}:lock")
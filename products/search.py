@@ -0,0 +1,308 @@
+"""
+Full-text search backends for the product catalog.
+
+This module keeps one `ProductSearchDocument` per product (name,
+description and category friendly name) and exposes a small backend
+abstraction used by `all_products` to search it.
+
+Backends:
+- `PostgresSearchBackend`: `SearchVector` stored in a GIN indexed column,
+  ranked with `SearchRank`. Used in production.
+- `SQLiteSearchBackend`: an FTS5 virtual table ranked with `bm25()`.
+  Used for local development and tests.
+- `BasicSearchBackend`: `icontains` fallback for any other database.
+
+Usage:
+    backend = get_search_backend()
+    products = backend.search(Product.objects.all(), "blue dress")
+"""
+
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection, OperationalError
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import ProductSearchDocument
+
+FTS_TABLE = "products_productsearch_fts"
+"""Name of the SQLite FTS5 virtual table."""
+
+_backend = None
+
+
+def build_document(product):
+    """
+    Build the searchable text fields for a product.
+
+    Args:
+        product (Product): The product to describe.
+
+    Returns:
+        dict: The `name`, `category` and `description` text.
+    """
+    category = product.category
+    return {
+        "name": product.name or "",
+        "category": (
+            (category.friendly_name or category.name) if category else ""
+        ),
+        "description": product.description or "",
+    }
+
+
+class BasicSearchBackend:
+    """
+    Fallback search backend using case-insensitive substring matching.
+
+    It also owns the `ProductSearchDocument` rows, which the other
+    backends build on.
+    """
+
+    def index_products(self, products):
+        """
+        Create or refresh the search documents for the given products.
+
+        Args:
+            products (Iterable[Product]): The products to index.
+
+        Returns:
+            list: The saved `ProductSearchDocument` instances.
+        """
+        documents = [
+            ProductSearchDocument(
+                product_id=product.pk, **build_document(product)
+            )
+            for product in products
+        ]
+        if documents:
+            ProductSearchDocument.objects.bulk_create(
+                documents,
+                update_conflicts=True,
+                unique_fields=["product"],
+                update_fields=["name", "category", "description"],
+            )
+        return documents
+
+    def remove_product(self, product_id):
+        """
+        Remove a product from the search index.
+
+        Args:
+            product_id (int): The primary key of the deleted product.
+        """
+        ProductSearchDocument.objects.filter(product_id=product_id).delete()
+
+    def search(self, queryset, query):
+        """
+        Filter a product queryset by a search query.
+
+        Args:
+            queryset (QuerySet): The products to search.
+            query (str): The user's search text.
+
+        Returns:
+            QuerySet: The matching products.
+        """
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+
+
+class PostgresSearchBackend(BasicSearchBackend):
+    """
+    PostgreSQL search backend using a stored, GIN indexed `tsvector`.
+
+    Names are weighted above categories, which are weighted above
+    descriptions, so `SearchRank` orders results by relevance.
+    """
+
+    config = "english"
+
+    def index_products(self, products):
+        """
+        Refresh the search documents and their stored vectors.
+
+        Args:
+            products (Iterable[Product]): The products to index.
+
+        Returns:
+            list: The saved `ProductSearchDocument` instances.
+        """
+        documents = super().index_products(products)
+        if documents:
+            ProductSearchDocument.objects.filter(
+                product_id__in=[d.product_id for d in documents]
+            ).update(
+                search_vector=(
+                    SearchVector("name", weight="A", config=self.config)
+                    + SearchVector(
+                        "category", weight="B", config=self.config
+                    )
+                    + SearchVector(
+                        "description", weight="C", config=self.config
+                    )
+                )
+            )
+        return documents
+
+    def search(self, queryset, query):
+        """
+        Search products and order them by relevance.
+
+        Args:
+            queryset (QuerySet): The products to search.
+            query (str): The user's search text (web search syntax).
+
+        Returns:
+            QuerySet: Matching products annotated with `search_rank`.
+        """
+        search_query = SearchQuery(
+            query, config=self.config, search_type="websearch"
+        )
+        return (
+            queryset.filter(search_document__search_vector=search_query)
+            .annotate(
+                search_rank=SearchRank(
+                    F("search_document__search_vector"), search_query
+                )
+            )
+            .order_by("-search_rank")
+        )
+
+
+class SQLiteSearchBackend(BasicSearchBackend):
+    """
+    SQLite search backend using an FTS5 virtual table.
+
+    The FTS5 table uses the product id as its `rowid` and is kept in step
+    with `ProductSearchDocument`. Results are ranked with `bm25()`.
+    """
+
+    # bm25() column weights for (name, category, description)
+    weights = (10.0, 5.0, 1.0)
+
+    def index_products(self, products):
+        """
+        Refresh the search documents and the FTS5 rows.
+
+        Args:
+            products (Iterable[Product]): The products to index.
+
+        Returns:
+            list: The saved `ProductSearchDocument` instances.
+        """
+        documents = super().index_products(products)
+        if documents:
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                    [(d.product_id,) for d in documents],
+                )
+                cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE} "
+                    "(rowid, name, category, description) "
+                    "VALUES (%s, %s, %s, %s)",
+                    [
+                        (d.product_id, d.name, d.category, d.description)
+                        for d in documents
+                    ],
+                )
+        return documents
+
+    def remove_product(self, product_id):
+        """
+        Remove a product from the search documents and FTS5 table.
+
+        Args:
+            product_id (int): The primary key of the deleted product.
+        """
+        super().remove_product(product_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id]
+            )
+
+    @staticmethod
+    def to_match_expression(query):
+        """
+        Convert free text into a safe FTS5 `MATCH` expression.
+
+        Each word is quoted (so FTS5 operators in user input are not
+        interpreted) and prefix-matched, and all words must match.
+
+        Args:
+            query (str): The user's search text.
+
+        Returns:
+            str: The FTS5 match expression, or an empty string.
+        """
+        terms = re.findall(r"\w+", query)
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, query):
+        """
+        Search products and order them by relevance.
+
+        Args:
+            queryset (QuerySet): The products to search.
+            query (str): The user's search text.
+
+        Returns:
+            QuerySet: Matching products annotated with `search_rank`.
+        """
+        expression = self.to_match_expression(query)
+        if not expression:
+            return queryset.none()
+
+        # bm25() scores are negative; lower means more relevant
+        rank = RawSQL(
+            f"bm25({FTS_TABLE}, %s, %s, %s)",
+            self.weights,
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(search_fts__document__match=expression)
+            .annotate(search_rank=rank)
+            .order_by("search_rank")
+        )
+
+
+def sqlite_fts_available():
+    """
+    Check whether the SQLite FTS5 table exists in the current database.
+
+    Returns:
+        bool: True if the FTS5 table can be queried.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {FTS_TABLE} LIMIT 0")
+        return True
+    except OperationalError:
+        return False
+
+
+def get_search_backend():
+    """
+    Return the search backend for the default database.
+
+    The backend is chosen once per process, based on the database vendor.
+
+    Returns:
+        BasicSearchBackend: The search backend instance.
+    """
+    global _backend
+    if _backend is None:
+        if connection.vendor == "postgresql":
+            _backend = PostgresSearchBackend()
+        elif connection.vendor == "sqlite" and sqlite_fts_available():
+            _backend = SQLiteSearchBackend()
+        else:
+            _backend = BasicSearchBackend()
+    return _backend
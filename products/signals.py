@@ -0,0 +1,325 @@
+"""
+Signals for the products application.
+
+This module defines signal handlers that keep the product search index
+in step with the catalog whenever a `Product` or `Category` changes, and
+that maintain the facet index and the promotional price table, keep
+`updated_at` meaningful for conditional GET, and invalidate the cached
+catalog counts, product card fragments and wishlist memberships.
+"""
+
+from decimal import Decimal
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .facets import (
+    adjust_facet_count,
+    cell_key,
+    product_cell,
+    rebuild_facet_counts,
+)
+from .fragments import bump_category_version, bump_product_versions
+from .models import Product, Category, Promotion, Wishlist
+from .promotions import rebuild_effective_prices
+from .search import get_search_backend
+from .wishlists import invalidate_wishlist
+
+
+@receiver(post_save, sender=Product)
+def index_product_on_save(sender, instance, **kwargs):
+    """
+    Refresh a product's search document when it is created or updated.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The saved product.
+        **kwargs: Additional keyword arguments.
+    """
+    get_search_backend().index_products([instance])
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_on_delete(sender, instance, **kwargs):
+    """
+    Remove a product from the search index when it is deleted.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The deleted product.
+        **kwargs: Additional keyword arguments.
+    """
+    get_search_backend().remove_product(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_on_save(sender, instance, created, **kwargs):
+    """
+    Re-index a category's products when the category is renamed.
+
+    The category friendly name is part of every product's search
+    document, so all products in the category are refreshed.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Category): The saved category.
+        created (bool): Indicates whether the category was created.
+        **kwargs: Additional keyword arguments.
+    """
+    if not created:
+        get_search_backend().index_products(
+            instance.product_set.select_related("category")
+        )
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_counts(sender, **kwargs):
+    """
+    Invalidate the cached catalog counts when the catalog changes.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        **kwargs: Additional keyword arguments.
+    """
+    bump_catalog_version()
+
+
+@receiver(pre_save, sender=Product)
+def remember_facet_cell(sender, instance, **kwargs):
+    """
+    Record a product's facet cell and price before it is saved.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The product about to be saved.
+        **kwargs: Additional keyword arguments.
+    """
+    previous = None
+    previous_price = None
+    if instance.pk is not None:
+        row = (
+            Product.objects.filter(pk=instance.pk)
+            .values_list("category_id", "price", "rating")
+            .first()
+        )
+        if row is not None:
+            previous = cell_key(*row)
+            previous_price = row[1]
+    instance._previous_facet_cell = previous
+    instance._previous_price = previous_price
+
+
+@receiver(post_save, sender=Product)
+def update_facet_counts_on_save(sender, instance, **kwargs):
+    """
+    Move a saved product to its new facet cell, if it changed.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The saved product.
+        **kwargs: Additional keyword arguments.
+    """
+    previous = getattr(instance, "_previous_facet_cell", None)
+    current = product_cell(instance)
+    if previous == current:
+        return
+    if previous is not None:
+        adjust_facet_count(previous, -1)
+    adjust_facet_count(current, 1)
+
+
+@receiver(post_delete, sender=Product)
+def update_facet_counts_on_delete(sender, instance, **kwargs):
+    """
+    Remove a deleted product from the facet index.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The deleted product.
+        **kwargs: Additional keyword arguments.
+    """
+    adjust_facet_count(product_cell(instance), -1)
+
+
+@receiver(post_delete, sender=Category)
+def rebuild_facet_counts_on_category_delete(sender, instance, **kwargs):
+    """
+    Recount the facet index when a category is deleted.
+
+    The category's products are moved to "uncategorized" with a bulk
+    update that sends no `Product` signals, so the index is rebuilt.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Category): The deleted category.
+        **kwargs: Additional keyword arguments.
+    """
+    rebuild_facet_counts()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_card(sender, instance, **kwargs):
+    """
+    Invalidate the cached card of a saved or deleted product.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The saved or deleted product.
+        **kwargs: Additional keyword arguments.
+    """
+    bump_product_versions([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cards(sender, instance, **kwargs):
+    """
+    Invalidate the cached cards of every product in a category.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Category): The saved or deleted category.
+        **kwargs: Additional keyword arguments.
+    """
+    bump_category_version(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+def touch_category_on_product_delete(sender, instance, **kwargs):
+    """
+    Mark a deleted product's category as modified.
+
+    The catalog's `Last-Modified` is the latest `updated_at`, which a
+    deletion would otherwise leave unchanged.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The deleted product.
+        **kwargs: Additional keyword arguments.
+    """
+    if instance.category_id:
+        Category.objects.filter(pk=instance.category_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(pre_delete, sender=Category)
+def touch_products_on_category_delete(sender, instance, **kwargs):
+    """
+    Mark a category's products as modified before it is deleted.
+
+    The products lose their category through a bulk update, which does
+    not set `updated_at` itself.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Category): The category about to be deleted.
+        **kwargs: Additional keyword arguments.
+    """
+    instance.product_set.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Product)
+def reprice_product_on_save(sender, instance, created, **kwargs):
+    """
+    Recompute a product's promotional price when its price changes.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Product): The saved product.
+        created (bool): Indicates whether the product was created.
+        **kwargs: Additional keyword arguments.
+    """
+    previous_price = getattr(instance, "_previous_price", None)
+    if not created and previous_price is not None:
+        if Decimal(str(instance.price)) != previous_price:
+            rebuild_effective_prices([instance.pk])
+
+
+@receiver(post_save, sender=Promotion)
+@receiver(post_delete, sender=Promotion)
+def reprice_on_promotion_change(sender, **kwargs):
+    """
+    Rebuild the promotional prices when a promotion changes.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        **kwargs: Additional keyword arguments.
+    """
+    rebuild_effective_prices()
+
+
+@receiver(m2m_changed, sender=Promotion.products.through)
+def reprice_on_promotion_products_change(sender, action, **kwargs):
+    """
+    Rebuild the promotional prices when a promotion's products change.
+
+    Args:
+        sender (Model): The promotion/product through model.
+        action (str): The type of change (`post_add`, `post_clear`, ...).
+        **kwargs: Additional keyword arguments.
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        rebuild_effective_prices()
+
+
+@receiver(m2m_changed, sender=Wishlist.products.through)
+def invalidate_wishlist_on_products_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Clear the cached wishlist ids of the owners of changed wishlists.
+
+    Args:
+        sender (Model): The wishlist/product through model.
+        instance (Model): The wishlist, or the product when the change
+            is made from the product side.
+        action (str): The type of change (`post_add`, `post_clear`, ...).
+        reverse (bool): True if `instance` is a product.
+        pk_set (set): The ids of the added or removed objects.
+        **kwargs: Additional keyword arguments.
+    """
+    if action == "pre_clear" and reverse:
+        # The cleared wishlists are only known before the change
+        instance._cleared_wishlist_owners = list(
+            instance.wishlisted_by.values_list("customer_id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_wishlist(instance.customer_id)
+        return
+    if action == "post_clear":
+        owners = getattr(instance, "_cleared_wishlist_owners", [])
+    else:
+        owners = Wishlist.objects.filter(pk__in=pk_set).values_list(
+            "customer_id", flat=True
+        )
+    for customer_id in owners:
+        invalidate_wishlist(customer_id)
+
+
+@receiver(post_delete, sender=Wishlist)
+def invalidate_wishlist_on_delete(sender, instance, **kwargs):
+    """
+    Clear the cached wishlist ids of a deleted wishlist's owner.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Wishlist): The deleted wishlist.
+        **kwargs: Additional keyword arguments.
+    """
+    invalidate_wishlist(instance.customer_id)
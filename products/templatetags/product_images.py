@@ -0,0 +1,83 @@
+"""
+Template tags for responsive product images.
+
+Usage:
+    {% load product_images %}
+    {% product_picture product sizes="200px" %}
+"""
+
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from products.images import FORMAT_OPTIONS, has_current_variants, variant_url
+
+register = template.Library()
+
+
+def _srcset(source, widths, fmt):
+    """Returns the `srcset` value listing every width of a format."""
+    return ", ".join(
+        f"{variant_url(source, width, fmt)} {width}w" for width in widths
+    )
+
+
+@register.simple_tag
+def product_picture(
+    product,
+    sizes="200px",
+    width=200,
+    height=200,
+    css_class="image-container",
+):
+    """
+    Render a product's uploaded image as a responsive `<picture>`.
+
+    Modern formats are offered as `<source>` elements and the JPEG
+    variants as the `<img>` fallback, each with a `srcset` of every
+    generated width. Products without current variants (not generated
+    yet, or generated from a previous image) get the original image.
+
+    Args:
+        product (Product): A product with an uploaded image.
+        sizes (str): The `sizes` attribute, i.e. the displayed width.
+        width (int): The `width` attribute of the image.
+        height (int): The `height` attribute of the image.
+        css_class (str): The CSS class of the image.
+
+    Returns:
+        str: The image markup.
+    """
+    variants = product.image_variants
+    if not has_current_variants(variants, product.image.name):
+        return format_html(
+            '<img class="{}" src="{}" alt="{}" width="{}" height="{}" '
+            'loading="lazy">',
+            css_class,
+            product.image.url,
+            product.name,
+            width,
+            height,
+        )
+
+    source, widths = variants["source"], variants["widths"]
+    *modern, fallback = variants["formats"]
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (FORMAT_OPTIONS[fmt][1], _srcset(source, widths, fmt), sizes)
+            for fmt in modern
+        ),
+    )
+    return format_html(
+        '<picture>{}<img class="{}" src="{}" srcset="{}" sizes="{}" '
+        'alt="{}" width="{}" height="{}" loading="lazy"></picture>',
+        sources,
+        css_class,
+        variant_url(source, widths[0], fallback),
+        _srcset(source, widths, fallback),
+        sizes,
+        product.name,
+        width,
+        height,
+    )
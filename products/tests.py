@@ -5,10 +5,44 @@ This module contains test cases for product-related views, including
 product listing, searching, filtering, and CRUD operations.
 """
 
-from django.test import TestCase, Client
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.http import QueryDict
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
-from .models import Product, Category
+from PIL import Image
+from bag.pricing import price_bag
+from .models import (
+    Product,
+    Category,
+    EffectivePrice,
+    ProductFacetCount,
+    Promotion,
+    Wishlist,
+)
+from .catalog import CatalogPaginator, CatalogQuery
+from .forms import ProductForm
+from .images import generate_variants, variant_name
+from .facets import get_facets, rebuild_facet_counts
+from .fragments import get_card_cache_stats, render_product_cards
+from .promotions import (
+    ensure_effective_prices_current,
+    rebuild_effective_prices,
+)
+from .search import get_search_backend
+from .wishlists import get_wishlisted_ids
 
 
 class TestProductViews(TestCase):
@@ -147,3 +181,752 @@ class TestProductViews(TestCase):
         )
         self.assertEqual(response.status_code, 302)  # Redirect to home page
         self.assertRedirects(response, reverse("home"))
+
+
+class TestProductSearch(TestCase):
+    """
+    Test cases for the full-text product search.
+
+    This class includes tests for:
+    - Ordering search results by relevance.
+    - Keeping the search index in step with product and category changes.
+    """
+
+    def setUp(self):
+        """
+        Create a category and products that mention "denim" in different
+        fields.
+        """
+        self.category = Category.objects.create(
+            name="boys", friendly_name="Boys"
+        )
+        self.in_description = Product.objects.create(
+            name="Summer Shirt",
+            description="Pairs well with denim shorts.",
+            price=12.00,
+        )
+        self.in_name = Product.objects.create(
+            name="Denim Jacket",
+            description="A warm jacket.",
+            price=30.00,
+            category=self.category,
+        )
+
+    def search(self, query):
+        """Return the names of products matching `query`, in order."""
+        return [
+            p.name
+            for p in get_search_backend().search(
+                Product.objects.all(), query
+            )
+        ]
+
+    def test_results_ordered_by_relevance(self):
+        """Test that name matches rank above description matches."""
+        self.assertEqual(
+            self.search("denim"), ["Denim Jacket", "Summer Shirt"]
+        )
+
+    def test_search_matches_category_friendly_name(self):
+        """Test that products can be found by category friendly name."""
+        self.assertEqual(self.search("boys"), ["Denim Jacket"])
+
+    def test_search_index_updated_on_save_and_delete(self):
+        """Test that renamed and deleted products are re-indexed."""
+        self.in_name.name = "Corduroy Jacket"
+        self.in_name.save()
+        self.assertEqual(self.search("corduroy"), ["Corduroy Jacket"])
+
+        self.in_name.delete()
+        self.assertEqual(self.search("jacket"), [])
+
+    def test_category_rename_reindexes_products(self):
+        """Test that renaming a category updates its products' documents."""
+        self.category.friendly_name = "Toddlers"
+        self.category.save()
+        self.assertEqual(self.search("toddlers"), ["Denim Jacket"])
+
+    def test_search_ignores_fts_syntax(self):
+        """Test that search operators in user input do not raise errors."""
+        self.assertEqual(
+            self.search('denim" ('), ["Denim Jacket", "Summer Shirt"]
+        )
+
+
+class TestCatalogPagination(TestCase):
+    """
+    Test cases for the catalog query pipeline and keyset pagination.
+
+    This class includes tests for:
+    - Paginating filtered results, with filters kept on the page links.
+    - Walking pages forwards and backwards with keyset cursors.
+    - Caching result counts until the catalog changes.
+    """
+
+    def setUp(self):
+        """
+        Create two categories and products with repeated prices and
+        missing ratings, so the ordering relies on its tie-breakers.
+        """
+        self.girls = Category.objects.create(name="girls")
+        self.boys = Category.objects.create(name="boys")
+        for i in range(15):
+            Product.objects.create(
+                name=f"Product {i:02d}",
+                description="Catalog product.",
+                price=5 + i % 4,
+                rating=None if i % 3 == 0 else i % 5,
+                category=self.girls if i < 9 else self.boys,
+            )
+
+    def walk(self, catalog_query):
+        """Return product ids page by page, following `after` cursors."""
+        paginator = CatalogPaginator(catalog_query)
+        ids = []
+        cursor = None
+        for number in paginator.page_range:
+            page = paginator.get_catalog_page(number, after=cursor)
+            ids.extend(p.pk for p in page)
+            cursor = page.next_cursor
+        return ids
+
+    def test_filters_applied_before_pagination(self):
+        """Test that the count and pages only include filtered products."""
+        response = self.client.get(reverse("products") + "?category=boys")
+        self.assertEqual(response.context["paginator"].count, 6)
+        self.assertEqual(response.context["paginator"].num_pages, 1)
+        self.assertContains(response, "6 Products")
+
+    def test_page_links_keep_filters(self):
+        """Test that pagination links keep the category and sort."""
+        response = self.client.get(
+            reverse("products") + "?category=girls&sort=price&page=1"
+        )
+        self.assertEqual(
+            response.context["page_query"],
+            "category=girls&sort=price&",
+        )
+        self.assertContains(
+            response, "?category=girls&amp;sort=price&amp;page=2"
+        )
+
+    def test_keyset_walk_matches_full_ordering(self):
+        """Test that following cursors visits every product in order."""
+        for sort in ("price", "rating", "name", "category"):
+            for direction in ("asc", "desc"):
+                catalog_query = CatalogQuery(sort=sort, direction=direction)
+                expected = list(
+                    catalog_query.queryset().values_list("pk", flat=True)
+                )
+                self.assertEqual(
+                    self.walk(catalog_query), expected, (sort, direction)
+                )
+
+    def test_before_cursor_returns_previous_page(self):
+        """Test that a `before` cursor returns the preceding page."""
+        paginator = CatalogPaginator(
+            CatalogQuery(sort="rating", direction="desc")
+        )
+        second = paginator.get_catalog_page(2)
+        first = paginator.get_catalog_page(1, before=second.previous_cursor)
+        self.assertEqual(
+            list(first), list(paginator.get_catalog_page(1).object_list)
+        )
+
+    def test_last_page_read_in_reverse(self):
+        """Test that a page read from the end matches the offset page."""
+        paginator = CatalogPaginator(CatalogQuery(sort="price"))
+        page = paginator.get_catalog_page(3)
+        self.assertEqual(list(page), list(paginator._offset_page(3)))
+        self.assertEqual(len(page), 3)
+
+    def test_cursor_for_other_query_ignored(self):
+        """Test that a cursor from a different sort falls back to offset."""
+        by_price = CatalogPaginator(CatalogQuery(sort="price"))
+        cursor = by_price.get_catalog_page(1).next_cursor
+        by_name = CatalogPaginator(CatalogQuery(sort="name"))
+        self.assertEqual(
+            list(by_name.get_catalog_page(2, after=cursor)),
+            list(by_name._offset_page(2)),
+        )
+        self.assertEqual(
+            list(by_name.get_catalog_page(2, after="not-a-cursor")),
+            list(by_name._offset_page(2)),
+        )
+
+    def test_count_cached_until_catalog_changes(self):
+        """Test that counts are cached and invalidated by changes."""
+        catalog_query = CatalogQuery(categories=["boys"])
+        queryset = catalog_query.queryset()
+        self.assertEqual(catalog_query.count(queryset), 6)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog_query.count(queryset), 6)
+
+        Product.objects.create(
+            name="New", description="New.", price=1, category=self.boys
+        )
+        self.assertEqual(catalog_query.count(queryset), 7)
+
+
+class TestProductFacets(TestCase):
+    """
+    Test cases for the precomputed facet index.
+
+    This class includes tests for:
+    - Keeping the index in step with product saves and deletes.
+    - Counting each facet under the other facets' selections.
+    - Filtering the catalog by price and rating.
+    """
+
+    def setUp(self):
+        """Create two categories with products across price buckets."""
+        self.boys = Category.objects.create(
+            name="boys", friendly_name="Boys"
+        )
+        self.girls = Category.objects.create(
+            name="girls", friendly_name="Girls"
+        )
+        self.cheap = Product.objects.create(
+            name="Cheap Socks",
+            description="Socks.",
+            price=5,
+            rating=4.5,
+            category=self.boys,
+        )
+        Product.objects.create(
+            name="Boys Coat",
+            description="Coat.",
+            price=60,
+            category=self.boys,
+        )
+        Product.objects.create(
+            name="Girls Dress",
+            description="Dress.",
+            price=8,
+            rating=3,
+            category=self.girls,
+        )
+
+    def index(self):
+        """Return the facet index as a dict of non-empty cells."""
+        return {
+            (row.category_id, row.price_bucket, row.rating_bucket): row.count
+            for row in ProductFacetCount.objects.filter(count__gt=0)
+        }
+
+    def assert_index_matches_rebuild(self):
+        """Assert the incremental index equals a full recount."""
+        incremental = self.index()
+        rebuild_facet_counts()
+        self.assertEqual(incremental, self.index())
+
+    def test_index_follows_saves_and_deletes(self):
+        """Test that the index is updated incrementally."""
+        self.assert_index_matches_rebuild()
+        self.cheap.price = 30
+        self.cheap.category = self.girls
+        self.cheap.save()
+        self.assert_index_matches_rebuild()
+        self.cheap.delete()
+        self.assert_index_matches_rebuild()
+
+    def test_category_delete_rebuilds_index(self):
+        """Test that deleting a category moves its products to no category."""
+        self.boys.delete()
+        self.assertEqual(self.index()[(None, 0, 4)], 1)
+        self.assert_index_matches_rebuild()
+
+    def test_counts_use_other_selections(self):
+        """Test that each facet is counted under the other selections."""
+        facets = get_facets(
+            CatalogQuery(categories=["boys"], price=0), QueryDict()
+        )
+        self.assertEqual(
+            [(o["label"], o["count"]) for o in facets["categories"]],
+            [("Boys", 1), ("Girls", 1)],
+        )
+        self.assertEqual(
+            [(o["label"], o["count"]) for o in facets["prices"]],
+            [("Under €10", 1), ("€50 to €100", 1)],
+        )
+        self.assertEqual(facets["current_categories"], [self.boys])
+        with self.assertNumQueries(1):
+            get_facets(CatalogQuery(), QueryDict())
+
+    def test_search_facets_count_matches(self):
+        """Test that search results are counted from the matches."""
+        facets = get_facets(CatalogQuery(query="coat"), QueryDict())
+        self.assertEqual(
+            [(o["label"], o["count"]) for o in facets["categories"]],
+            [("Boys", 1)],
+        )
+
+    def test_price_and_rating_filters(self):
+        """Test that the catalog can be filtered by price and rating."""
+        response = self.client.get(reverse("products") + "?price=0")
+        self.assertEqual(response.context["paginator"].count, 2)
+        self.assertContains(response, "Boys (1)")
+
+        response = self.client.get(reverse("products") + "?rating=none")
+        self.assertEqual(
+            [p.name for p in response.context["page_obj"]], ["Boys Coat"]
+        )
+        response = self.client.get(reverse("products") + "?rating=4")
+        self.assertEqual(
+            [p.name for p in response.context["page_obj"]], ["Cheap Socks"]
+        )
+
+
+class TestProductCardCache(TestCase):
+    """
+    Test cases for the versioned product card fragment cache.
+
+    This class includes tests for:
+    - Serving repeated cards from the cache and counting hits/misses.
+    - Invalidating cards from product, category and promotion changes.
+    """
+
+    def setUp(self):
+        """Start from an empty cache with one categorized product."""
+        cache.clear()
+        self.category = Category.objects.create(
+            name="jeans", friendly_name="Jeans"
+        )
+        self.product = Product.objects.create(
+            name="Blue Jeans",
+            description="Denim.",
+            price=20,
+            category=self.category,
+        )
+
+    def render(self):
+        """Render the product's card and return its HTML."""
+        product = Product.objects.select_related("category").get(
+            pk=self.product.pk
+        )
+        return render_product_cards([product])[0][1]
+
+    def test_repeated_render_is_a_hit(self):
+        """Test that a card is rendered once and then served from cache."""
+        first = self.render()
+        self.assertIn("Blue Jeans", first)
+        with self.assertTemplateNotUsed(
+            "products/includes/product_card.html"
+        ):
+            self.assertEqual(self.render(), first)
+        self.assertEqual(
+            get_card_cache_stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5}
+        )
+
+    def test_product_save_invalidates_card(self):
+        """Test that saving a product re-renders its card."""
+        self.render()
+        self.product.price = 25
+        self.product.save()
+        self.assertIn("25", self.render())
+        self.assertEqual(get_card_cache_stats()["misses"], 2)
+
+    def test_category_change_invalidates_card(self):
+        """Test that renaming a category re-renders its products' cards."""
+        self.render()
+        self.category.friendly_name = "Denim"
+        self.category.save()
+        self.assertIn("Denim", self.render())
+
+    def test_promotion_change_invalidates_card(self):
+        """Test that adding a product to a promotion re-renders it."""
+        self.render()
+        promotion = Promotion.objects.create(
+            name="Sale",
+            discount_percentage=10,
+            start_date=date.today(),
+            end_date=date.today(),
+        )
+        promotion.products.add(self.product)
+        self.render()
+        self.assertEqual(get_card_cache_stats()["misses"], 2)
+
+    def test_stats_view_restricted_to_superusers(self):
+        """Test that only superusers can read the cache counters."""
+        url = reverse("card_cache_stats")
+        User.objects.create_user(username="user", password="userpass")
+        self.client.login(username="user", password="userpass")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        User.objects.create_superuser(
+            username="admin", password="adminpass", email="a@example.com"
+        )
+        self.client.login(username="admin", password="adminpass")
+        self.client.get(reverse("products"))
+        response = self.client.get(url)
+        self.assertEqual(response.json()["misses"], 1)
+
+
+class TestConditionalGet(TestCase):
+    """
+    Test cases for conditional GET on the catalog and product pages.
+
+    This class includes tests for:
+    - Answering matching `If-None-Match` / `If-Modified-Since` with 304.
+    - Changing the validators when the catalog or the viewer changes.
+    """
+
+    def setUp(self):
+        """Create a categorized product."""
+        self.category = Category.objects.create(
+            name="shirts", friendly_name="Shirts"
+        )
+        self.product = Product.objects.create(
+            name="Striped Shirt",
+            description="Stripes.",
+            price=15,
+            category=self.category,
+        )
+        self.detail_url = reverse("product_detail", args=[self.product.pk])
+
+    def assert_not_modified(self, url, **headers):
+        """Assert that `url` answers 304 without rendering a template."""
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+
+    def test_product_detail_not_modified(self):
+        """Test that an unchanged product page is answered with 304."""
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+        self.assert_not_modified(
+            self.detail_url, if_none_match=response["ETag"]
+        )
+        self.assert_not_modified(
+            self.detail_url, if_modified_since=response["Last-Modified"]
+        )
+
+    def test_product_change_modifies_pages(self):
+        """Test that saving a product changes both pages' ETags."""
+        detail = self.client.get(self.detail_url)["ETag"]
+        catalog = self.client.get(reverse("products"))["ETag"]
+        self.product.price = 18
+        self.product.save()
+        self.assertNotEqual(self.client.get(self.detail_url)["ETag"], detail)
+        self.assertNotEqual(
+            self.client.get(reverse("products"))["ETag"], catalog
+        )
+
+    def test_catalog_not_modified_until_delete(self):
+        """Test that deleting a product changes the catalog validators."""
+        url = reverse("products") + "?category=shirts"
+        response = self.client.get(url)
+        self.assert_not_modified(url, if_none_match=response["ETag"])
+        self.product.delete()
+        self.assertEqual(
+            self.client.get(
+                url, headers={"if_none_match": response["ETag"]}
+            ).status_code,
+            200,
+        )
+
+    def test_viewer_state_in_validators(self):
+        """Test that the bag and login state change the ETag."""
+        etag = self.client.get(self.detail_url)["ETag"]
+        session = self.client.session
+        session["bag"] = {str(self.product.pk): 1}
+        session.save()
+        response = self.client.get(self.detail_url)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        User.objects.create_user(username="user", password="userpass")
+        self.client.login(username="user", password="userpass")
+        self.assertNotEqual(
+            self.client.get(self.detail_url)["ETag"], response["ETag"]
+        )
+
+
+class TestEffectivePrices(TestCase):
+    """
+    Test cases for the materialized promotional price table.
+
+    This class includes tests for:
+    - Applying the best active promotion to products.
+    - Ignoring promotions outside their date range.
+    - Reading promotional prices without extra queries per product.
+    """
+
+    def setUp(self):
+        """Create products and an active promotion on one of them."""
+        cache.clear()
+        self.today = timezone.localdate()
+        self.shirt = Product.objects.create(
+            name="Shirt", description="Shirt.", price=Decimal("20.00")
+        )
+        self.hat = Product.objects.create(
+            name="Hat", description="Hat.", price=Decimal("10.00")
+        )
+        self.sale = self.promotion(25, self.today, self.today)
+        self.sale.products.add(self.shirt)
+
+    def promotion(self, discount, start_date, end_date):
+        """Create a promotion with the given discount and dates."""
+        return Promotion.objects.create(
+            name=f"{discount}% off",
+            discount_percentage=discount,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def current_price(self, product):
+        """Return a product's current price, loaded as the catalog does."""
+        return (
+            Product.objects.select_related("effective_price")
+            .get(pk=product.pk)
+            .current_price
+        )
+
+    def test_best_active_promotion_applies(self):
+        """Test that the largest active discount sets the price."""
+        self.assertEqual(self.current_price(self.shirt), Decimal("15.00"))
+        self.assertEqual(self.current_price(self.hat), Decimal("10.00"))
+
+        bigger = self.promotion(50, self.today, self.today)
+        bigger.products.add(self.shirt)
+        self.assertEqual(self.current_price(self.shirt), Decimal("10.00"))
+        bigger.delete()
+        self.assertEqual(self.current_price(self.shirt), Decimal("15.00"))
+
+    def test_price_change_updates_effective_price(self):
+        """Test that changing a product's price reprices its promotion."""
+        self.shirt.price = Decimal("40.00")
+        self.shirt.save()
+        self.assertEqual(self.current_price(self.shirt), Decimal("30.00"))
+
+    def test_inactive_promotions_ignored(self):
+        """Test that future and past promotions do not apply."""
+        tomorrow = self.today + timedelta(days=1)
+        future = self.promotion(50, tomorrow, tomorrow)
+        future.products.add(self.hat)
+        self.assertEqual(self.current_price(self.hat), Decimal("10.00"))
+
+        # The sale ended yesterday; the stale row is ignored until rebuilt
+        EffectivePrice.objects.filter(product=self.shirt).update(
+            valid_until=self.today - timedelta(days=1)
+        )
+        self.assertEqual(self.current_price(self.shirt), Decimal("20.00"))
+        Promotion.objects.filter(pk=self.sale.pk).update(
+            end_date=self.today - timedelta(days=1)
+        )
+        rebuild_effective_prices()
+        self.assertFalse(EffectivePrice.objects.exists())
+
+    def test_prices_read_without_extra_queries(self):
+        """Test that the catalog and bag read promotions in one query."""
+        with self.assertNumQueries(1):
+            prices = [p.current_price for p in CatalogQuery().queryset()]
+        self.assertEqual(prices, [Decimal("15.00"), Decimal("10.00")])
+
+        ensure_effective_prices_current()
+        bag = {str(self.shirt.pk): 2, str(self.hat.pk): 1}
+        with self.assertNumQueries(1):
+            self.assertEqual(price_bag(bag)["total"], Decimal("40.00"))
+
+
+class TestWishlistMembership(TestCase):
+    """
+    Test cases for the batched wishlist membership lookups.
+
+    This class includes tests for:
+    - Loading a page's wishlisted products in one cached query.
+    - Invalidating the cached ids when the wishlist changes.
+    - Paginating the wishlist page.
+    """
+
+    def setUp(self):
+        """Create a customer, products and an empty wishlist."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="customer", password="customerpass"
+        )
+        self.wishlist = Wishlist.objects.create(customer=self.user)
+        self.products = [
+            Product.objects.create(
+                name=f"Toy {i:02}", description="A toy.", price=5
+            )
+            for i in range(14)
+        ]
+        self.ids = [product.pk for product in self.products]
+
+    def test_membership_cached_per_user(self):
+        """Test that membership is loaded once and then read from cache."""
+        self.wishlist.products.add(*self.products[:2])
+        with self.assertNumQueries(1):
+            wishlisted = get_wishlisted_ids(self.user, self.ids[1:6])
+        self.assertEqual(wishlisted, {self.ids[1]})
+        with self.assertNumQueries(0):
+            get_wishlisted_ids(self.user, self.ids)
+
+    def test_membership_invalidated_on_change(self):
+        """Test that adding and removing products refreshes the ids."""
+        self.assertEqual(get_wishlisted_ids(self.user, self.ids), set())
+        self.wishlist.products.add(self.products[0])
+        self.assertEqual(
+            get_wishlisted_ids(self.user, self.ids), {self.ids[0]}
+        )
+        self.products[0].wishlisted_by.clear()
+        self.assertEqual(get_wishlisted_ids(self.user, self.ids), set())
+
+    def test_add_and_remove_views(self):
+        """Test that the views update the wishlist and catalog marks."""
+        self.client.login(username="customer", password="customerpass")
+        product = self.products[0]
+        self.client.post(reverse("add_to_wishlist", args=[product.pk]))
+        self.client.post(reverse("add_to_wishlist", args=[product.pk]))
+        self.assertEqual(list(self.wishlist.products.all()), [product])
+        response = self.client.get(reverse("products"))
+        self.assertEqual(response.context["wishlisted_ids"], {product.pk})
+
+        self.client.get(reverse("remove_from_wishlist", args=[product.pk]))
+        self.assertFalse(self.wishlist.products.exists())
+        response = self.client.get(reverse("products"))
+        self.assertEqual(response.context["wishlisted_ids"], set())
+
+    def test_wishlist_paginated(self):
+        """Test that the wishlist page is paginated."""
+        self.wishlist.products.add(*self.products)
+        self.client.login(username="customer", password="customerpass")
+        response = self.client.get(reverse("wishlist"))
+        self.assertEqual(len(response.context["wishlist_items"]), 12)
+        self.assertTrue(response.context["is_paginated"])
+        response = self.client.get(reverse("wishlist") + "?page=2")
+        self.assertEqual(
+            [p.name for p in response.context["wishlist_items"]],
+            ["Toy 12", "Toy 13"],
+        )
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    MEDIA_URL="/media/",
+    STORAGES={
+        "default": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage"
+        },
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage."
+            "StaticFilesStorage"
+        },
+    },
+)
+class TestImageVariants(TestCase):
+    """
+    Test cases for the product image variant pipeline.
+
+    This class includes tests for:
+    - Generating variants when a product image is uploaded.
+    - Resuming the bulk command without regenerating current variants.
+    - Rendering `srcset` markup, with a fallback for stale variants.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the generated media files."""
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        """Create a category for the products."""
+        cache.clear()
+        self.category = Category.objects.create(
+            name="toys", friendly_name="Toys"
+        )
+
+    def image_bytes(self, size=(1000, 500), mode="RGBA"):
+        """Returns a PNG image of the given size."""
+        buffer = io.BytesIO()
+        Image.new(mode, size, "orange").save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def product_with_image(self, name, size=(1000, 500)):
+        """Create a product whose uploaded image has no variants."""
+        product = Product.objects.create(
+            name=name, description="A toy.", price=5, category=self.category
+        )
+        product.image.save(
+            f"{name}.png", ContentFile(self.image_bytes(size))
+        )
+        return product
+
+    def test_form_upload_generates_variants(self):
+        """Test that uploading an image through the form makes variants."""
+        form = ProductForm(
+            data={
+                "name": "Kite",
+                "description": "Flies.",
+                "price": "9.99",
+                "category": self.category.pk,
+            },
+            files={
+                "image": SimpleUploadedFile(
+                    "kite.png", self.image_bytes(), "image/png"
+                )
+            },
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        product = form.save()
+        product.refresh_from_db()
+
+        variants = product.image_variants
+        self.assertEqual(variants["source"], product.image.name)
+        self.assertEqual(variants["widths"], [200, 400, 800])
+        self.assertEqual(variants["formats"][-1], "jpeg")
+        name = variant_name(product.image.name, 400, "webp")
+        with default_storage.open(name) as variant:
+            self.assertEqual(Image.open(variant).size, (400, 200))
+
+    def test_small_images_not_upscaled(self):
+        """Test that images narrower than the variants keep their size."""
+        product = self.product_with_image("pin", size=(120, 120))
+        self.assertEqual(
+            generate_variants(product.image.name)["widths"], [120]
+        )
+
+    def test_command_resumes(self):
+        """Test that the command skips products with current variants."""
+        done = self.product_with_image("ball")
+        Product.objects.filter(pk=done.pk).update(
+            image_variants={
+                "source": done.image.name,
+                "widths": [200],
+                "formats": ["jpeg"],
+            }
+        )
+        pending = self.product_with_image("drum")
+
+        out = io.StringIO()
+        call_command("generate_image_variants", workers=0, stdout=out)
+        self.assertIn(
+            "Generated variants for 1 images (0 failed)", out.getvalue()
+        )
+        pending.refresh_from_db()
+        self.assertEqual(
+            pending.image_variants["source"], pending.image.name
+        )
+        done.refresh_from_db()
+        self.assertEqual(done.image_variants["widths"], [200])
+
+    def test_picture_tag(self):
+        """Test that the tag emits srcset markup, or the original image."""
+        product = self.product_with_image("yoyo")
+        template = Template(
+            "{% load product_images %}{% product_picture product %}"
+        )
+        html = template.render(Context({"product": product}))
+        self.assertIn(product.image.url, html)
+        self.assertNotIn("srcset", html)
+
+        product.image_variants = generate_variants(product.image.name)
+        html = template.render(Context({"product": product}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn("yoyo-400w.webp 400w", html)
+        self.assertIn('sizes="200px"', html)
@@ -37,4 +37,10 @@ urlpatterns = [
         name="remove_from_wishlist",
     ),
     # URL for removing a product from the user's wishlist
+    path(
+        "card-cache-stats/",
+        views.card_cache_stats,
+        name="card_cache_stats",
+    ),
+    # URL for the product card cache hit/miss counters (store owners only)
 ]
@@ -9,90 +9,119 @@ and managing products, including wishlist functionality and
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.db.models.functions import Lower
-from django.http import Http404
-from django.urls import reverse
 from django.core.paginator import Paginator
-from .models import Product, Category, Wishlist
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from .models import Product, Wishlist
 from .forms import ProductForm
-
-
+from .catalog import CatalogPaginator, CatalogQuery
+from .conditional import (
+    catalog_etag,
+    catalog_last_modified,
+    product_etag,
+    product_last_modified,
+)
+from .facets import get_facets
+from .fragments import get_card_cache_stats, render_product_cards
+from .wishlists import get_wishlisted_ids, is_wishlisted
+
+WISHLIST_PER_PAGE = 12
+"""Number of products shown on each wishlist page."""
+
+
+@cache_control(private=True, max_age=0)
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
 def all_products(request):
     """
     Display all products, including sorting and search functionality.
 
     This view allows users to filter products by category, search for specific
-    products by name or description, and sort them based on selected criteria.
+    products by name, description or category, and sort them based on
+    selected criteria. Search results are ordered by relevance unless a
+    sort order is chosen.
+
+    Filters are applied before pagination, so the count and every page
+    reflect the filtered results. Next/previous links carry keyset
+    cursors (see `products.catalog`). Category, price and rating facets
+    are shown with their product counts, and product cards are served
+    from a versioned fragment cache (see `products.fragments`).
+    Unchanged pages are answered with 304 before the view runs (see
+    `products.conditional`).
     """
-    products = Product.objects.all()
+    catalog_query = CatalogQuery.from_request(request)
 
-    paginator = Paginator(products, 6)
+    if "q" in request.GET and not catalog_query.query:
+        messages.error(request, "You didn't enter any search criteria!")
+        return redirect(reverse("products"))
+
+    paginator = CatalogPaginator(catalog_query)
     page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginator.get_catalog_page(
+        page_number,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
     is_paginated = paginator.num_pages > 1
 
-    query = None
-    categories = None
-    sort = None
-    direction = None
-
-    if request.GET:
-        if "sort" in request.GET:
-            sortkey = request.GET["sort"]
-            sort = sortkey
-            if sortkey == "name":
-                sortkey = "lower_name"
-                products = products.annotate(lower_name=Lower("name"))
-            if sortkey == "category":
-                sortkey = "category__name"
-            if "direction" in request.GET:
-                direction = request.GET["direction"]
-                if direction == "desc":
-                    sortkey = f"-{sortkey}"
-            products = products.order_by(sortkey)
-
-        if "category" in request.GET:
-            categories = request.GET["category"].split(",")
-            products = products.filter(category__name__in=categories)
-            categories = Category.objects.filter(name__in=categories)
-
-        if "q" in request.GET:
-            query = request.GET["q"]
-            if not query:
-                messages.error(
-                    request, "You didn't enter any search criteria!"
-                )
-                return redirect(reverse("products"))
-
-            queries = Q(name__icontains=query) | Q(
-                description__icontains=query
-            )
-            products = products.filter(queries)
+    # Filters are kept on the pagination links; the cursors are not
+    params = request.GET.copy()
+    for key in ("page", "after", "before"):
+        params.pop(key, None)
+    page_query = f"{params.urlencode()}&" if params else ""
 
-    current_sorting = f"{sort}_{direction}"
+    # Facet counts come from the precomputed index (see products.facets)
+    facets = get_facets(catalog_query, request.GET)
+
+    current_sorting = f"{catalog_query.sort}_{catalog_query.direction}"
 
     context = {
-        "products": products,
-        "search_term": query,
-        "current_categories": categories,
+        "products": page_obj.object_list,
+        "search_term": catalog_query.query,
+        "current_categories": facets["current_categories"],
+        "facets": facets,
         "current_sorting": current_sorting,
         "paginator": paginator,
         "page_number": page_number,
         "page_obj": page_obj,
+        "product_cards": render_product_cards(page_obj.object_list),
+        "wishlisted_ids": get_wishlisted_ids(
+            request.user, [product.pk for product in page_obj.object_list]
+        ),
+        "page_query": page_query,
         "is_paginated": is_paginated,
     }
     return render(request, "products/products.html", context)
 
 
+@login_required
+def card_cache_stats(request):
+    """
+    Return the product card cache hit/miss counters as JSON.
+
+    Only superusers (store owners) are allowed to access this view.
+    """
+    if not request.user.is_superuser:
+        messages.error(request, "Sorry, only store owners can do that.")
+        return redirect(reverse("home"))
+
+    return JsonResponse(get_card_cache_stats())
+
+
+@cache_control(private=True, max_age=0)
+@condition(etag_func=product_etag, last_modified_func=product_last_modified)
 def product_detail(request, product_id):
     """
     Display individual product details.
 
-    Raises a 404 error if the product does not exist.
+    Raises a 404 error if the product does not exist. Unchanged pages are
+    answered with 304 before the view runs (see `products.conditional`).
     """
     try:
-        product = Product.objects.get(id=product_id)
+        product = Product.objects.select_related("effective_price").get(
+            id=product_id
+        )
     except Product.DoesNotExist:
         print("404 - Product not found")
         raise Http404("Product does not exist")
@@ -200,7 +229,7 @@ def add_to_wishlist(request, product_id):
             customer=request.user
         )
 
-        if product not in wishlist.products.all():
+        if not is_wishlisted(wishlist, product.pk):
             wishlist.products.add(product)
             messages.success(
                 request, f"{product.name} has been added to your wishlist."
@@ -223,7 +252,7 @@ def remove_from_wishlist(request, product_id):
     product = get_object_or_404(Product, id=product_id)
     try:
         wishlist = Wishlist.objects.get(customer=request.user)
-        if product in wishlist.products.all():
+        if is_wishlisted(wishlist, product.pk):
             wishlist.products.remove(product)
             messages.success(
                 request,
@@ -242,21 +271,29 @@ def remove_from_wishlist(request, product_id):
 @login_required
 def wishlist(request):
     """
-    Display the user's wishlist.
+    Display the user's wishlist, paginated.
 
     If the user does not have a wishlist, an empty response is handled.
     """
     try:
         wishlist = Wishlist.objects.get(customer=request.user)
-        wishlist_items = wishlist.products.all()
     except Wishlist.DoesNotExist:
-        wishlist_items = (
-            None  # Handle the case where no wishlist exists for the user
-        )
+        wishlist = None  # Handle the case where no wishlist exists
 
-    return render(
-        request, "products/wishlist.html", {"wishlist_items": wishlist_items}
-    )
+    page_obj = None
+    if wishlist is not None:
+        products = wishlist.products.select_related(
+            "category", "effective_price"
+        ).order_by("name", "pk")
+        paginator = Paginator(products, WISHLIST_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get("page"))
+
+    context = {
+        "wishlist_items": page_obj.object_list if page_obj else None,
+        "page_obj": page_obj,
+        "is_paginated": bool(page_obj) and page_obj.paginator.num_pages > 1,
+    }
+    return render(request, "products/wishlist.html", context)
 
 
 def custom_404(request, exception):
@@ -0,0 +1,88 @@
+"""
+Wishlist membership lookups for the products application.
+
+Catalog pages mark the cards a customer has already wishlisted. Rather
+than testing each product against the wishlist, the ids of all the
+customer's wishlisted products are loaded in one query and cached per
+user. The cache is cleared whenever the wishlist's products change (see
+`signals.py`), including changes made in the admin.
+
+Usage:
+    wishlisted = get_wishlisted_ids(request.user, [p.pk for p in page])
+"""
+
+from django.core.cache import cache
+
+from .models import Wishlist
+
+WISHLIST_TIMEOUT = 60 * 60
+"""Seconds a user's cached wishlist ids are kept."""
+
+
+def _wishlist_key(user_id):
+    """Returns the cache key holding a user's wishlisted product ids."""
+    return f"products:wishlist:{user_id}"
+
+
+def get_wishlist_ids(user):
+    """
+    Return the ids of every product in a user's wishlist.
+
+    Args:
+        user (User): The user (may be anonymous).
+
+    Returns:
+        frozenset: The wishlisted product ids.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    key = _wishlist_key(user.pk)
+    product_ids = cache.get(key)
+    if product_ids is None:
+        product_ids = frozenset(
+            Wishlist.products.through.objects.filter(
+                wishlist__customer_id=user.pk
+            ).values_list("product_id", flat=True)
+        )
+        cache.set(key, product_ids, timeout=WISHLIST_TIMEOUT)
+    return product_ids
+
+
+def get_wishlisted_ids(user, product_ids):
+    """
+    Return which of the given products are in a user's wishlist.
+
+    Args:
+        user (User): The user (may be anonymous).
+        product_ids (Iterable[int]): The products shown on the page.
+
+    Returns:
+        set: The ids of the wishlisted products among `product_ids`.
+    """
+    return get_wishlist_ids(user).intersection(product_ids)
+
+
+def is_wishlisted(wishlist, product_id):
+    """
+    Check whether a product is in a wishlist with an indexed lookup.
+
+    Args:
+        wishlist (Wishlist): The customer's wishlist.
+        product_id (int): The product's id.
+
+    Returns:
+        bool: True if the product is in the wishlist.
+    """
+    return Wishlist.products.through.objects.filter(
+        wishlist=wishlist, product_id=product_id
+    ).exists()
+
+
+def invalidate_wishlist(user_id):
+    """
+    Clear a user's cached wishlist ids.
+
+    Args:
+        user_id (int): The wishlist owner's id.
+    """
+    cache.delete(_wishlist_key(user_id))
@@ -7,7 +7,7 @@ the `reviews` app within the Django project.
 Key Features:
 - Specifies the default primary key field type (`BigAutoField`).
 - Registers the app name as `"reviews"`.
-- Provides a `ready()` method, which can be used for app-specific initialization.
+- Registers the signal handlers that maintain product review statistics.
 """
 
 from django.apps import AppConfig
@@ -24,3 +24,12 @@ class ReviewsConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "reviews"
+
+    def ready(self):
+        """
+        Import and register signal handlers when the app is ready.
+
+        This keeps each product's review statistics up to date whenever
+        reviews change.
+        """
+        import reviews.signals  # Import signals to register them
@@ -0,0 +1,70 @@
+"""
+Management command to recompute product review statistics.
+
+Usage:
+    python manage.py recompute_product_ratings [--chunk-size 1000]
+"""
+
+from django.core.management.base import BaseCommand
+
+from products.catalog import bump_catalog_version
+from products.facets import rebuild_facet_counts
+from products.models import Product
+from reviews.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    """
+    Recompute `rating`, `review_count` and the star histogram of every
+    product from its reviews.
+
+    Products are processed in primary key order, in chunks, so the
+    command can be used to backfill large catalogs. Products without
+    rated reviews are left without a rating.
+    """
+
+    help = "Recompute product ratings and review counts from reviews."
+
+    def add_arguments(self, parser):
+        """
+        Adds command-line arguments.
+
+        Args:
+            parser (ArgumentParser): The argument parser.
+        """
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of products updated per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Executes the command.
+
+        Args:
+            *args: Positional arguments.
+            **options: Parsed command-line options.
+        """
+        chunk_size = options["chunk_size"]
+        product_ids = Product.objects.order_by("pk").values_list(
+            "pk", flat=True
+        )
+
+        updated = 0
+        last_pk = 0
+        while True:
+            chunk = list(product_ids.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            updated += recompute_ratings(chunk)
+            last_pk = chunk[-1]
+
+        # Ratings were written in bulk, without Product signals
+        rebuild_facet_counts()
+        bump_catalog_version()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Recomputed ratings for {updated} products.")
+        )
@@ -0,0 +1,92 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:40
+
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Q
+
+from products.facets import count_cells
+
+
+def backfill_product_ratings(apps, schema_editor):
+    """
+    Derive every product's review statistics from its reviews.
+
+    Ratings entered by hand are replaced; products without rated
+    reviews are left without a rating. The facet index is recounted, as
+    it depends on the rating.
+    """
+    Product = apps.get_model("products", "Product")
+    ProductFacetCount = apps.get_model("products", "ProductFacetCount")
+    Review = apps.get_model("reviews", "Review")
+    star_fields = {n: f"rating_{n}_count" for n in range(1, 6)}
+
+    stats = {
+        row.pop("product_id"): row
+        for row in Review.objects.filter(
+            review_type="product", product__isnull=False
+        )
+        .values("product_id")
+        .annotate(
+            review_count=Count("pk"),
+            **{
+                field: Count("pk", filter=Q(rating=n))
+                for n, field in star_fields.items()
+            },
+        )
+        .order_by()
+    }
+
+    products = []
+    for product in Product.objects.iterator():
+        row = stats.get(product.pk, {})
+        product.review_count = row.get("review_count", 0)
+        for field in star_fields.values():
+            setattr(product, field, row.get(field, 0))
+        rated = sum(row.get(field, 0) for field in star_fields.values())
+        stars = sum(row.get(f, 0) * n for n, f in star_fields.items())
+        product.rating = (
+            (Decimal(stars) / rated).quantize(Decimal("0.01"))
+            if rated
+            else None
+        )
+        products.append(product)
+    Product.objects.bulk_update(
+        products,
+        ["review_count", "rating", *star_fields.values()],
+        batch_size=1000,
+    )
+
+    cells = count_cells(
+        Product.objects.values_list("category_id", "price", "rating")
+        .order_by()
+        .iterator()
+    )
+    ProductFacetCount.objects.all().delete()
+    ProductFacetCount.objects.bulk_create(
+        [
+            ProductFacetCount(
+                category_id=category_id,
+                price_bucket=price_bucket,
+                rating_bucket=rating_bucket,
+                count=count,
+            )
+            for (category_id, price_bucket, rating_bucket), count in (
+                cells.items()
+            )
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0008_product_review_counters"),
+        ("reviews", "0002_review_product_review_review_type_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_product_ratings, migrations.RunPython.noop
+        ),
+    ]
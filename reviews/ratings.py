@@ -0,0 +1,170 @@
+"""
+Denormalized review statistics for products.
+
+Each `Product` stores its `review_count`, a 1-5 star histogram
+(`rating_<n>_count`) and the average `rating`, so the catalog can show
+and sort by rating without aggregating reviews at read time.
+
+Key Features:
+- `apply_review_change` adds or removes a single review with `F()`
+  expressions, so concurrent reviews never lose an update. The average
+  is then recomputed in SQL from the histogram.
+- `recompute_ratings` rebuilds the statistics from the `Review` table,
+  for backfills and repairs (see the `recompute_product_ratings`
+  command).
+- Rating changes are propagated to the catalog facet index, cached
+  counts and product card fragments, which `QuerySet.update()` would
+  otherwise bypass.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast, NullIf, Round
+from django.utils import timezone
+
+from products.catalog import bump_catalog_version
+from products.facets import adjust_facet_count, cell_key
+from products.fragments import bump_product_versions
+from products.models import Product
+
+from .models import Review
+
+STAR_FIELDS = {stars: f"rating_{stars}_count" for stars in range(1, 6)}
+"""The histogram field for each star rating."""
+
+
+def review_target(review_type, product_id, rating):
+    """
+    Return what a review contributes to a product's statistics.
+
+    Args:
+        review_type (str): `"product"` or `"site"`.
+        product_id (int): The reviewed product's id, or None.
+        rating (int): The star rating, or None.
+
+    Returns:
+        tuple or None: `(product_id, rating)`, or None for reviews that
+            do not count towards a product.
+    """
+    if review_type != "product" or not product_id:
+        return None
+    return (product_id, rating)
+
+
+def average_rating():
+    """
+    Build the SQL expression for the average rating from the histogram.
+
+    Returns:
+        Expression: The average rounded to 2 places, or NULL if unrated.
+    """
+    stars = sum(F(field) * n for n, field in STAR_FIELDS.items())
+    rated = sum(F(field) for field in STAR_FIELDS.values())
+    return Round(Cast(stars, FloatField()) / NullIf(rated, 0), 2)
+
+
+def _rating_changed(product_id, before, after):
+    """
+    Propagate a product's new rating to the catalog caches.
+
+    Args:
+        product_id (int): The product's id.
+        before (tuple): `(category_id, price, rating)` before the change.
+        after (tuple): `(category_id, price, rating)` after the change.
+    """
+    if before[2] == after[2]:
+        return
+    previous, current = cell_key(*before), cell_key(*after)
+    if previous != current:
+        adjust_facet_count(previous, -1)
+        adjust_facet_count(current, 1)
+    bump_product_versions([product_id])
+    bump_catalog_version()
+
+
+def apply_review_change(product_id, rating, delta):
+    """
+    Add (`delta=1`) or remove (`delta=-1`) one review from a product.
+
+    Args:
+        product_id (int): The reviewed product's id.
+        rating (int): The review's star rating, or None.
+        delta (int): `1` to add the review, `-1` to remove it.
+    """
+    products = Product.objects.filter(pk=product_id)
+    updates = {
+        "review_count": F("review_count") + delta,
+        "updated_at": timezone.now(),
+    }
+    if rating in STAR_FIELDS:
+        updates[STAR_FIELDS[rating]] = F(STAR_FIELDS[rating]) + delta
+
+    with transaction.atomic():
+        before = (
+            products.select_for_update()
+            .values_list("category_id", "price", "rating")
+            .first()
+        )
+        if before is None:
+            return  # The product is being deleted
+        products.update(**updates)
+        if rating not in STAR_FIELDS:
+            return
+        products.update(rating=average_rating())
+        after = products.values_list(
+            "category_id", "price", "rating"
+        ).first()
+        _rating_changed(product_id, before, after)
+
+
+def recompute_ratings(product_ids):
+    """
+    Recompute the review statistics of products from their reviews.
+
+    Args:
+        product_ids (Iterable[int]): The ids of the products to update.
+
+    Returns:
+        int: The number of products updated.
+    """
+    product_ids = list(product_ids)
+    stats = {
+        row.pop("product_id"): row
+        for row in Review.objects.filter(
+            review_type="product", product_id__in=product_ids
+        )
+        .values("product_id")
+        .annotate(
+            review_count=Count("pk"),
+            **{
+                field: Count("pk", filter=Q(rating=stars))
+                for stars, field in STAR_FIELDS.items()
+            },
+        )
+        .order_by()
+    }
+
+    now = timezone.now()
+    products = list(Product.objects.filter(pk__in=product_ids))
+    for product in products:
+        row = stats.get(product.pk, {})
+        product.review_count = row.get("review_count", 0)
+        for field in STAR_FIELDS.values():
+            setattr(product, field, row.get(field, 0))
+        rated = sum(row.get(field, 0) for field in STAR_FIELDS.values())
+        stars = sum(row.get(f, 0) * n for n, f in STAR_FIELDS.items())
+        product.rating = (
+            (Decimal(stars) / rated).quantize(Decimal("0.01"))
+            if rated
+            else None
+        )
+        product.updated_at = now
+
+    Product.objects.bulk_update(
+        products,
+        ["review_count", "rating", "updated_at", *STAR_FIELDS.values()],
+    )
+    bump_product_versions(product_ids)
+    return len(products)
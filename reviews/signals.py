@@ -0,0 +1,84 @@
+"""
+Signals for the reviews application.
+
+This module defines signal handlers that keep each product's review
+count, star histogram and average rating in step with its reviews
+(see `reviews.ratings`).
+"""
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from products.models import Product
+
+from .models import Review
+from .ratings import apply_review_change, review_target
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_target(sender, instance, **kwargs):
+    """
+    Record what a review counted towards before it is saved.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Review): The review about to be saved.
+        **kwargs: Additional keyword arguments.
+    """
+    previous = None
+    if instance.pk is not None:
+        row = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list("review_type", "product_id", "rating")
+            .first()
+        )
+        if row is not None:
+            previous = review_target(*row)
+    instance._previous_review_target = previous
+
+
+@receiver(post_save, sender=Review)
+def update_ratings_on_save(sender, instance, **kwargs):
+    """
+    Update product statistics when a review is created or edited.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Review): The saved review.
+        **kwargs: Additional keyword arguments.
+    """
+    previous = getattr(instance, "_previous_review_target", None)
+    current = review_target(
+        instance.review_type, instance.product_id, instance.rating
+    )
+    if previous == current:
+        return
+    if previous is not None:
+        apply_review_change(*previous, delta=-1)
+    if current is not None:
+        apply_review_change(*current, delta=1)
+
+
+@receiver(post_delete, sender=Review)
+def update_ratings_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Update product statistics when a review is deleted.
+
+    Reviews deleted because their product is being deleted are skipped.
+
+    Args:
+        sender (Model): The model that triggered the signal.
+        instance (Review): The deleted review.
+        origin (Model or QuerySet): Where the deletion started.
+        **kwargs: Additional keyword arguments.
+    """
+    if isinstance(origin, Product) or (
+        isinstance(origin, QuerySet) and origin.model is Product
+    ):
+        return
+    target = review_target(
+        instance.review_type, instance.product_id, instance.rating
+    )
+    if target is not None:
+        apply_review_change(*target, delta=-1)
@@ -10,10 +10,14 @@ This module includes:
 Each test case follows Django best practices for database testing using `pytest.mark.django_db`.
 """
 
+from decimal import Decimal
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
 from django.contrib.auth.models import User
-from products.models import Product
+from products.models import Product, ProductFacetCount
 from reviews.models import Review
 
 
@@ -204,3 +208,65 @@ def test_review_delete_view_unauthorized_user(client, user2, review):
     response = client.post(reverse("review_delete", args=[review.id]))
     assert response.status_code == 404  # Should return 404 (not found)
     assert Review.objects.count() == 1  # Review should still exist
+
+
+@pytest.mark.django_db
+def test_product_rating_follows_reviews(user, user2, review, product):
+    """
+    Tests that a product's rating statistics follow its reviews.
+
+    Ensures that:
+    - Creating, editing and deleting reviews update the counters.
+    - The average rating is derived from the star histogram.
+    - Site feedback does not count towards a product.
+    """
+    second = Review.objects.create(
+        customer=user2, product=product, rating=2, comment="Too small."
+    )
+    Review.objects.create(
+        customer=user2, review_type="site", rating=1, comment="Slow site."
+    )
+    product.refresh_from_db()
+    assert product.review_count == 2
+    assert product.rating == Decimal("3.50")
+    assert product.rating_histogram == [
+        (5, 1),
+        (4, 0),
+        (3, 0),
+        (2, 1),
+        (1, 0),
+    ]
+
+    second.rating = 4
+    second.save()
+    review.delete()
+    product.refresh_from_db()
+    assert product.review_count == 1
+    assert product.rating == Decimal("4.00")
+    assert (product.rating_5_count, product.rating_4_count) == (0, 1)
+
+    second.delete()
+    product.refresh_from_db()
+    assert product.review_count == 0
+    assert product.rating is None
+
+
+@pytest.mark.django_db
+def test_recompute_product_ratings_command(user, review, product):
+    """
+    Tests that the recompute command rebuilds the statistics in bulk.
+
+    Ensures that counters drifted by bulk updates are repaired and the
+    facet index matches the new rating.
+    """
+    Product.objects.filter(pk=product.pk).update(
+        review_count=7, rating_5_count=0, rating=None
+    )
+    call_command(
+        "recompute_product_ratings", chunk_size=1, stdout=StringIO()
+    )
+    product.refresh_from_db()
+    assert product.review_count == 1
+    assert product.rating_5_count == 1
+    assert product.rating == Decimal("5.00")
+    assert ProductFacetCount.objects.get(rating_bucket=5).count == 1
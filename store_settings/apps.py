@@ -7,8 +7,7 @@ the `store_settings` app within the Django project.
 Key Features:
 - Defines the default primary key field type (`BigAutoField`).
 - Registers the app name as `"store_settings"`.
-- Provides a `ready()` method, which can be used to import signals
-  or perform other startup logic.
+- Imports the signal handlers in `ready()`.
 """
 
 from django.apps import AppConfig
@@ -30,7 +29,7 @@ class StoreSettingsConfig(AppConfig):
         """
         Runs when the Django app is ready.
 
-        This method can be used to import signals or execute startup logic.
-        Currently, it does nothing, but it can be extended if needed.
+        Imports the signal handlers, which keep the settings cache and
+        subscribers up to date.
         """
-        pass
+        import store_settings.signals  # Import signals to register them
@@ -0,0 +1,122 @@
+"""
+Process-local cache of the store and shipping settings.
+
+`StoreSettings` and `ShippingSettings` are read by the maintenance
+middleware and the context processors on every request but change a few
+times a year. This module keeps both in process memory and, at most
+every `STORE_SETTINGS_CHECK_INTERVAL` seconds, compares a version stamp
+stored on the `StoreSettings` row with the one it loaded.
+
+Saving or deleting either model sets a new stamp (see `signals.py`), so
+every worker process reloads within one interval. The stamp lives in
+the database rather than the cache, as the default cache backend is
+local to each process.
+
+The cached instances are shared between requests and must be treated as
+read-only; views that edit the settings load their own instances.
+
+Usage:
+    store = get_store_settings()
+    currency = get_currency()
+"""
+
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from .models import ShippingSettings, StoreSettings
+
+_lock = threading.Lock()
+_state = {
+    "version": None,
+    "checked_at": None,
+    "store": None,
+    "shipping": None,
+}
+
+
+def _check_interval():
+    """Returns the number of seconds between version checks."""
+    return getattr(settings, "STORE_SETTINGS_CHECK_INTERVAL", 5)
+
+
+def _load():
+    """
+    Return the cached settings, reloading them if the stamp changed.
+
+    Returns:
+        dict: The cache state, with `store` and `shipping` loaded.
+    """
+    now = time.monotonic()
+    checked_at = _state["checked_at"]
+    if checked_at is not None and now - checked_at < _check_interval():
+        return _state
+
+    with _lock:
+        if _state["checked_at"] is not checked_at:
+            return _state  # Another thread checked meanwhile
+        version = (
+            StoreSettings.objects.filter(pk=1)
+            .values_list("version", flat=True)
+            .first()
+        )
+        if version is None or version != _state["version"]:
+            store = StoreSettings.get_instance()
+            _state["store"] = store
+            _state["shipping"] = ShippingSettings.objects.all().first()
+            _state["version"] = store.version
+        _state["checked_at"] = now
+    return _state
+
+
+def get_store_settings():
+    """
+    Return the store settings, from the process cache when current.
+
+    Returns:
+        StoreSettings: The store settings (read-only).
+    """
+    return _load()["store"]
+
+
+def get_shipping_settings():
+    """
+    Return the shipping settings, from the process cache when current.
+
+    Returns:
+        ShippingSettings or None: The shipping settings (read-only).
+    """
+    return _load()["shipping"]
+
+
+def get_currency():
+    """
+    Return the store currency as a lowercase ISO 4217 code for Stripe.
+
+    Returns:
+        str: e.g. `"eur"`; `settings.STRIPE_CURRENCY` if unset.
+    """
+    currency = get_store_settings().currency
+    return (currency or settings.STRIPE_CURRENCY).lower()
+
+
+def bump_settings_version():
+    """
+    Mark the cached settings of every process as stale.
+
+    A random stamp is used rather than a counter, so a save from an
+    instance loaded before the last bump cannot restore an old stamp.
+    The local cache is cleared immediately.
+    """
+    StoreSettings.objects.filter(pk=1).update(version=uuid.uuid4())
+    clear_settings_cache()
+
+
+def clear_settings_cache():
+    """Drop this process's cached settings."""
+    with _lock:
+        _state.update(
+            version=None, checked_at=None, store=None, shipping=None
+        )
@@ -16,7 +16,7 @@ Usage:
 """
 
 from django.shortcuts import HttpResponse
-from store_settings.models import StoreSettings
+from store_settings.cache import get_store_settings
 
 store_settings = None  # Global store settings instance
 
@@ -54,7 +54,7 @@ class MaintenanceModeMiddleware:
             HttpResponse: The maintenance message if the mode is enabled,
                           or the normal response if not.
         """
-        store_settings = StoreSettings.get_instance()
+        store_settings = get_store_settings()
         if (
             store_settings
             and store_settings.enable_maintenance_mode  # Check if maintenance mode is enabled
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:33
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store_settings", "0003_alter_storesettings_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="storesettings",
+            name="version",
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
@@ -10,6 +10,8 @@ This module defines:
 Each model provides methods for efficient management and retrieval.
 """
 
+import uuid
+
 from django.conf import settings
 from django.core.mail import send_mail
 from django.contrib import messages
@@ -44,6 +46,7 @@ class StoreSettings(models.Model):
         enable_paypal (bool): Enables PayPal as a payment method.
         enable_stripe (bool): Enables Stripe as a payment method.
         enable_cash_on_delivery (bool): Enables cash on delivery as a payment method.
+        version (UUID): Changed on every settings save; see `cache.py`.
     """
 
     user = models.OneToOneField(
@@ -79,6 +82,8 @@ class StoreSettings(models.Model):
     enable_stripe = models.BooleanField(default=True)
     enable_cash_on_delivery = models.BooleanField(default=True)
 
+    version = models.UUIDField(default=uuid.uuid4, editable=False)
+
     def save(self, *args, **kwargs):
         """
         Ensures that there is only one `StoreSettings` instance.
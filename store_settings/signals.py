@@ -5,26 +5,24 @@ This module listens for Django model events such as:
 - `post_save`: Triggered after a model instance is saved.
 - `pre_save`: Triggered before a model instance is saved.
 - `post_delete`: Triggered after a model instance is deleted.
-- `post_migrate`: Triggered after migrations are applied.
 
 These signals help in:
-- Automatically updating Stripe currency settings.
+- Invalidating the cached store settings of every worker process.
 - Logging creation, updates, and deletions of `StoreSettings`.
 - Creating a `Subscriber` when a new `User` is registered.
 """
 
 import logging
 from django.contrib.auth.models import User
-from django.conf import settings
 from django.db.models.signals import (
     post_delete,
-    post_migrate,
     post_save,
     pre_save,
 )
 from django.dispatch import receiver
 
-from .models import StoreSettings
+from .cache import bump_settings_version
+from .models import ShippingSettings, StoreSettings
 from store_settings.models import Subscriber
 
 # Initialize logger for recording model changes
@@ -32,46 +30,20 @@ logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=StoreSettings)
-def update_stripe_currency(sender, instance, **kwargs):
-    """
-    Automatically updates the `STRIPE_CURRENCY` in Django settings
-    whenever `StoreSettings` is modified.
-
-    Args:
-        sender (Model): The model class (`StoreSettings`).
-        instance (StoreSettings): The instance being saved.
-        **kwargs: Additional keyword arguments.
-
-    Example:
-        If the currency is updated in the admin panel, this ensures that
-        the `STRIPE_CURRENCY` setting reflects the change immediately.
-    """
-    setattr(settings, "STRIPE_CURRENCY", instance.currency.upper())
-    print(f"🔄 Stripe Currency Updated to: {settings.STRIPE_CURRENCY}")
-
-
-@receiver(post_migrate)
-def load_settings_on_startup(sender, **kwargs):
+@receiver(post_delete, sender=StoreSettings)
+@receiver(post_save, sender=ShippingSettings)
+@receiver(post_delete, sender=ShippingSettings)
+def invalidate_settings_cache(sender, **kwargs):
     """
-    Loads the latest store settings after migrations are applied.
-
-    This ensures that key configurations (e.g., `STRIPE_CURRENCY`) are
-    correctly loaded from the database when Django starts.
+    Marks the cached store and shipping settings of every worker as stale
+    whenever either model is saved or deleted (in the admin, the store
+    settings page or the shell).
 
     Args:
-        sender (AppConfig or None): The sender triggering the signal.
+        sender (Model): The model class that triggered the signal.
         **kwargs: Additional keyword arguments.
-
-    If no store settings exist, a default value of `"EUR"` is used.
     """
-    settings_obj = StoreSettings.objects.first()
-    if settings_obj:
-        setattr(settings, "STRIPE_CURRENCY", settings_obj.currency.upper())
-        print(
-            f"✅ Loaded Stripe Currency on Startup: {settings.STRIPE_CURRENCY}"
-        )
-    else:
-        setattr(settings, "STRIPE_CURRENCY", "EUR")  # Default value
+    bump_settings_version()
 
 
 @receiver(post_save, sender=StoreSettings)
@@ -147,6 +119,13 @@ def create_subscriber(sender, instance, created, **kwargs):
         **kwargs: Additional keyword arguments.
 
     This ensures that every registered user is automatically subscribed.
+    Users without an email address cannot be subscribed, and an existing
+    subscription for the same address is linked to the new user.
     """
-    if created:
-        Subscriber.objects.get_or_create(user=instance, email=instance.email)
+    if created and instance.email:
+        subscriber, _ = Subscriber.objects.get_or_create(
+            email=instance.email, defaults={"user": instance}
+        )
+        if subscriber.user_id is None:
+            subscriber.user = instance
+            subscriber.save(update_fields=["user"])
@@ -3,6 +3,7 @@ Django test cases for store settings and subscriber functionality.
 
 This module contains:
 - `StoreSettingsTests`: Tests for viewing and updating store settings.
+- `SettingsCacheTests`: Tests for the process-local settings cache.
 - `SubscriberTests`: Tests for subscribing and unsubscribing users.
 
 The tests ensure that:
@@ -13,9 +14,12 @@ The tests ensure that:
 Rich is used for enhanced console output to indicate test results.
 """
 
+import uuid
+
 from django.test import TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
+from .cache import get_currency, get_shipping_settings, get_store_settings
 from .models import Subscriber, StoreSettings, ShippingSettings, UserProfile
 from rich.console import Console
 from rich.theme import Theme
@@ -117,6 +121,52 @@ class StoreSettingsTests(TestCase):
         console.print("✅ [pass]Password change test passed![/pass]")
 
 
+class SettingsCacheTests(TestCase):
+    """
+    Test case for the process-local store settings cache.
+
+    These tests validate:
+    - Settings are served from memory between version checks.
+    - Saving the settings invalidates the cache.
+    - A change made by another process is picked up at the next check.
+    """
+
+    def setUp(self):
+        """Create the store and shipping settings."""
+        self.store_settings = StoreSettings.get_instance()
+        ShippingSettings.objects.create(store=self.store_settings)
+
+    def test_settings_served_from_memory(self):
+        """Test that only the version is queried, and only when due."""
+        with self.assertNumQueries(3):
+            get_store_settings()
+        with self.assertNumQueries(0):
+            get_store_settings()
+            get_shipping_settings()
+        with self.settings(STORE_SETTINGS_CHECK_INTERVAL=0):
+            with self.assertNumQueries(1):
+                get_store_settings()
+
+    def test_save_invalidates_cache(self):
+        """Test that saving the settings updates the cached currency."""
+        self.assertEqual(get_currency(), "eur")
+        self.store_settings.currency = "USD"
+        self.store_settings.save()
+        self.assertEqual(get_currency(), "usd")
+
+    def test_other_process_change_detected(self):
+        """Test that a new version stamp reloads the settings."""
+        self.assertFalse(get_store_settings().enable_maintenance_mode)
+        # Simulate a save in another worker: the row changes but this
+        # process's signal handlers do not run
+        StoreSettings.objects.filter(pk=1).update(
+            enable_maintenance_mode=True, version=uuid.uuid4()
+        )
+        self.assertFalse(get_store_settings().enable_maintenance_mode)
+        with self.settings(STORE_SETTINGS_CHECK_INTERVAL=0):
+            self.assertTrue(get_store_settings().enable_maintenance_mode)
+
+
 class SubscriberTests(TestCase):
     """
     Test case for email subscription and unsubscription.